@@ -0,0 +1,115 @@
+"""
+Measure the hot paths of a request to the deepest subadmin of a synthetic tree: building the SubAdminHelper,
+resolving and reversing its URLs, preparing its form, rendering the breadcrumbs, adding preserved filters, and
+complete changelist, add and change views. Every path is reported with its latency, database queries and
+peak memory allocated per call.
+
+    python -m benchmarks.bench_paths --depth 4 --fanout 4
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from benchmarks.project import SyntheticTree, setup
+
+
+def measure(func, number):
+    from django.db import connection
+
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    func()
+
+    # The test client resets connection.queries_log on every request, count them as they are executed instead.
+    with connection.execute_wrapper(count_queries):
+        func()
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+
+    latency = timeit.timeit(func, number=number) / number
+    return latency * 1e6, len(queries), peak / 1024
+
+
+def get_paths(tree, user):
+    from django.template import Context, Template
+    from django.test import Client, RequestFactory
+    from django.urls import resolve
+
+    from subadmin import SubAdminHelper
+
+    modeladmin = tree.deepest_admin
+    view_args = tree.get_view_args()
+    changelist_path = tree.get_path()
+    change_path = tree.get_path(view='change')
+
+    request = RequestFactory().get(changelist_path)
+    request.user = user
+    request.subadmin = SubAdminHelper(modeladmin, view_args, request=request)
+
+    def build_helper():
+        vars(request).pop('_subadmin_cache', None)
+        return SubAdminHelper(modeladmin, view_args, request=request)
+
+    breadcrumbs = Template('{% load subadmin_tags %}{% subadmin_breadcrumbs %}')
+    breadcrumbs_context = {'request': request, 'opts': modeladmin.model._meta}
+
+    def render_breadcrumbs():
+        vars(request.subadmin).pop('breadcrumbs', None)
+        return breadcrumbs.render(Context(breadcrumbs_context))
+    filters_context = {'opts': modeladmin.model._meta, 'preserved_filters': '_changelist_filters=q%3Drow%26o%3D1'}
+
+    client = Client()
+    client.force_login(user)
+
+    return [
+        ('helper', build_helper),
+        ('resolve', lambda: resolve(change_path)),
+        ('reverse_url', lambda: modeladmin.reverse_url('change', *view_args + ('1',))),
+        ('get_form', lambda: modeladmin.get_form(request)),
+        ('breadcrumbs', render_breadcrumbs),
+        ('preserved_filters', lambda: modeladmin.add_preserved_filters(filters_context, change_path)),
+        ('changelist_view', lambda: client.get(changelist_path)),
+        ('add_view', lambda: client.get(tree.get_path(view=None) + 'add/')),
+        ('change_view', lambda: client.get(change_path)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=4, help='deepest level of nesting to measure')
+    parser.add_argument('--fanout', type=int, default=4, help='sibling subadmins on every level')
+    parser.add_argument('--rows', type=int, default=20, help='objects in the deepest changelist')
+    parser.add_argument('--number', type=int, default=500, help='calls per measurement')
+    parser.add_argument('--view-number', type=int, default=20, help='calls per measurement of complete views')
+    parser.add_argument('--flat', action='store_true', help='use flat subadmin URLs')
+    args = parser.parse_args()
+
+    setup()
+
+    from django.contrib.auth.models import User
+    from django.test.utils import override_settings
+
+    user = User.objects.create_superuser('benchmarks', 'benchmarks@example.com', 'benchmarks')
+
+    print('%5s  %-18s  %12s  %7s  %10s' % ('depth', 'path', 'latency (us)', 'queries', 'peak (KiB)'))
+    for depth in range(1, args.depth + 1):
+        tree = SyntheticTree(depth, args.fanout, flat=args.flat)
+        tree.create_tables()
+        tree.create_objects(args.rows)
+
+        with override_settings(ROOT_URLCONF=tree.urlconf):
+            for name, func in get_paths(tree, user):
+                number = args.view_number if name.endswith('_view') else args.number
+                print('%5d  %-18s  %12.1f  %7d  %10.1f' % ((depth, name) + measure(func, number)))
+
+
+if __name__ == '__main__':
+    main()
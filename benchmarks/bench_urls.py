@@ -0,0 +1,38 @@
+"""
+Measure how long resolve() takes for the deepest URL of a synthetic subadmin tree, with nested (regex) and
+flat (path converter) subadmin URLs, as the depth of the tree grows.
+
+    python -m benchmarks.bench_urls --depth 6 --fanout 4
+"""
+import argparse
+import timeit
+
+from benchmarks.project import SyntheticTree, setup
+
+
+def bench_resolve(tree, path, number):
+    from django.urls import resolve
+
+    resolve(path, urlconf=tree.urlconf)
+    return timeit.timeit(lambda: resolve(path, urlconf=tree.urlconf), number=number) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=6, help='deepest level of nesting to measure')
+    parser.add_argument('--fanout', type=int, default=4, help='sibling subadmins on every level')
+    parser.add_argument('--number', type=int, default=2000, help='resolve() calls per measurement')
+    args = parser.parse_args()
+
+    setup()
+
+    print('%5s  %6s  %14s  %14s' % ('depth', 'view', 'nested (us)', 'flat (us)'))
+    for depth in range(1, args.depth + 1):
+        trees = [SyntheticTree(depth, args.fanout, flat=flat) for flat in (False, True)]
+        for view in (None, 'change'):
+            timings = [bench_resolve(tree, tree.get_path(view=view), args.number) for tree in trees]
+            print('%5d  %6s  %14.1f  %14.1f' % (depth, view or 'list', timings[0], timings[1]))
+
+
+if __name__ == '__main__':
+    main()
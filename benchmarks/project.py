@@ -0,0 +1,164 @@
+import types
+
+import django
+from django.conf import settings
+
+
+def setup():
+    if settings.configured:
+        return
+
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='benchmarks',
+        ALLOWED_HOSTS=['*'],
+        INSTALLED_APPS=[
+            'django.contrib.admin',
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'django.contrib.sessions',
+            'django.contrib.messages',
+            'subadmin',
+            'benchmarks',
+        ],
+        MIDDLEWARE=[
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.middleware.csrf.CsrfViewMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+        ],
+        TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True,
+            'OPTIONS': {
+                'context_processors': [
+                    'django.template.context_processors.request',
+                    'django.contrib.auth.context_processors.auth',
+                    'django.contrib.messages.context_processors.messages',
+                ],
+            },
+        }],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        ROOT_URLCONF='benchmarks.project',
+        DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+        USE_TZ=True,
+    )
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+urlpatterns = []
+
+
+class SyntheticTree(object):
+    """
+    A RootSubAdmin with `depth` levels of nested SubAdmins below it, each level holding `fanout` sibling
+    models. Only the last sibling of every level has children, so URLs pointing at the deepest level have to
+    get past all of its siblings while resolving.
+    """
+
+    def __init__(self, depth, fanout, flat=False):
+        from django.contrib.admin import AdminSite
+        from django.urls import path
+
+        self.depth = depth
+        self.fanout = fanout
+        self.name = 'd%df%d%s' % (depth, fanout, 'flat' if flat else 'nested')
+        self.root_model = self.make_model('Root')
+        self.levels = [[self.root_model]]
+
+        parent = self.root_model
+        for level in range(1, depth + 1):
+            models = [self.make_model('L%dN%d' % (level, i), parent) for i in range(fanout)]
+            self.levels.append(models)
+            parent = models[-1]
+
+        self.site = AdminSite(name=self.name)
+        self.site.register(self.root_model, self.make_admin_class(flat))
+        self.root_admin = self.site._registry[self.root_model]
+
+        self.urlconf = types.ModuleType('benchmarks.urls_%s' % self.name)
+        self.urlconf.urlpatterns = [path('admin/', self.site.urls)]
+
+    def make_model(self, name, parent=None):
+        from django.db import models
+
+        attrs = {
+            '__module__': 'benchmarks.models',
+            '__str__': lambda obj: obj.name,
+            'Meta': type('Meta', (), {'app_label': 'benchmarks'}),
+            'name': models.CharField(max_length=100),
+        }
+        if parent is not None:
+            attrs['parent'] = models.ForeignKey(parent, on_delete=models.CASCADE)
+
+        return type('%s%s' % (self.name.capitalize(), name), (models.Model,), attrs)
+
+    def make_admin_class(self, flat):
+        from subadmin import RootSubAdmin, SubAdmin
+
+        subadmins = []
+        for models in self.levels[:0:-1]:
+            subadmins = [
+                type('%sSubAdmin' % model.__name__, (SubAdmin,), {
+                    'model': model,
+                    'list_display': ('name',),
+                    'subadmins': subadmins if model is models[-1] else [],
+                }) for model in models
+            ]
+
+        return type('%sAdmin' % self.root_model.__name__, (RootSubAdmin,), {
+            'list_display': ('name',),
+            'subadmins': subadmins,
+            'flat_subadmin_urls': flat,
+        })
+
+    def create_tables(self):
+        from django.db import connection
+
+        with connection.schema_editor() as schema_editor:
+            for model in self.models:
+                schema_editor.create_model(model)
+
+    def create_objects(self, rows=20):
+        """
+        Create the chain of parents with pk=1 along the deepest URL, and `rows` children under its last parent.
+        """
+        parent = self.root_model.objects.create(pk=1, name='root')
+        for models in self.levels[1:-1]:
+            parent = models[-1].objects.create(pk=1, name=models[-1]._meta.model_name, parent=parent)
+
+        self.deepest_model.objects.bulk_create([
+            self.deepest_model(pk=pk, name='row %d' % pk, parent=parent) for pk in range(1, rows + 1)
+        ])
+
+    @property
+    def deepest_admin(self):
+        modeladmin = self.root_admin
+        for models in self.levels[1:]:
+            modeladmin = next(sub_admin for sub_admin in modeladmin.subadmin_instances if sub_admin.model is models[-1])
+        return modeladmin
+
+    def get_view_args(self, pk=1):
+        return tuple(str(pk) for i in range(self.depth))
+
+    @property
+    def models(self):
+        return [model for models in self.levels for model in models]
+
+    @property
+    def deepest_model(self):
+        return self.levels[-1][-1]
+
+    def get_path(self, pk=1, view=None):
+        opts = self.root_model._meta
+        parts = ['/admin', opts.app_label, opts.model_name, str(pk)]
+        for models in self.levels[1:]:
+            parts += [models[-1]._meta.model_name, str(pk)]
+
+        parts = parts[:-1]
+        if view is not None:
+            parts += [str(pk), view]
+        return '/'.join(parts) + '/'
@@ -1,64 +1,469 @@
+import base64
+import copy
+import csv
+import hashlib
+import io
 import json
-from collections import OrderedDict
+import logging
+import re
+import time
+import uuid
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Sequence
+from contextlib import ExitStack, contextmanager, nullcontext
 from functools import partial, update_wrapper
-from urllib.parse import parse_qsl, urlparse, urlunparse
+from urllib.parse import parse_qsl, quote as url_quote, urlparse, urlunparse
+
+from asgiref.sync import sync_to_async
 
 from django.urls import path, re_path, include
-from django.core.exceptions import ValidationError
-from django.contrib.admin.options import IS_POPUP_VAR, TO_FIELD_VAR
-from django.contrib.admin.utils import unquote, quote
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import NON_FIELD_ERRORS, FieldDoesNotExist, ObjectDoesNotExist, PermissionDenied, ValidationError
+from django.contrib.admin.options import IS_POPUP_VAR, TO_FIELD_VAR, IncorrectLookupParameters
+from django.contrib.admin.utils import NestedObjects, label_for_field, lookup_field, model_ngettext, unquote, quote
 from django.contrib import admin
 from django.contrib import messages
-from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
 from django.contrib.admin.actions import delete_selected
-from django.db import transaction
+from django import forms
+from django.db import connections, router, transaction
+from django.db.models.deletion import Collector
+from django.db.models import CASCADE, PROTECT, RESTRICT, Count, Manager, Prefetch, Q, QuerySet, Subquery, prefetch_related_objects
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.forms.models import _get_foreign_key
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.template.response import TemplateResponse
+from django.template.response import SimpleTemplateResponse, TemplateResponse
 from django.utils.decorators import method_decorator
+from django.utils.encoding import force_str
 from django.utils.functional import cached_property
 from django.utils.html import format_html
-from django.utils.http import urlencode
-from django.utils.translation import gettext as _
+from django.utils.text import capfirst
+from django.utils.safestring import mark_safe
+from django.utils.timezone import get_current_timezone_name
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes, urlencode
+from django.utils.translation import get_language, gettext as _, ngettext
 from django.views.decorators.csrf import csrf_protect
-from django.urls import Resolver404, get_script_prefix, resolve, reverse
+from django.urls import NoReverseMatch, Resolver404, get_resolver, get_script_prefix, get_urlconf, resolve, reverse
+from django.urls.resolvers import get_ns_resolver
+
+from .signals import phase_finished, view_finished
+from .views import SubAdminAutocompleteJsonView
+from .widgets import SubAdminAutocompleteSelect, SubAdminAutocompleteSelectMultiple, SubAdminForeignKeyRawIdWidget
 
 csrf_protect_m = method_decorator(csrf_protect)
 
-__all__ = ('SubAdmin', 'RootSubAdmin', 'SubAdminMixin', 'RootSubAdminMixin', 'SubAdminChangeList', 'SubAdminHelper', 'SubAdminFormMixin')
+logger = logging.getLogger('subadmin')
+
+CURSOR_VAR = 'cursor'
+
+def quote_url_arg(arg):
+    return url_quote(str(arg), safe=RFC3986_SUBDELIMS + '/~:@')
+
+
+def format_url_template(template, args):
+    """
+    Return the URL template (see SubAdminBase.get_url_template()) gives for args, or None when args don't match
+    the converters and regexes of the URL pattern, like reverse() checks them.
+    """
+    url_format, params, converters, regex = template
+    texts = {}
+    for param, arg in zip(params, args):
+        if param in converters:
+            try:
+                texts[param] = converters[param].to_url(arg)
+            except ValueError:
+                return None
+        else:
+            texts[param] = str(arg)
+
+    url = url_format % texts
+    if not regex.search(url):
+        return None
+    return escape_leading_slashes(quote_url_arg(url))
+
+__all__ = ('SubAdmin', 'RootSubAdmin', 'SubAdminMixin', 'RootSubAdminMixin', 'SubAdminChangeList', 'SubAdminHelper', 'SubAdminFormMixin',
+           'SubAdminRequestCache', 'SubAdminTimings')
+
+
+def export_json_default(value):
+    try:
+        return DjangoJSONEncoder().default(value)
+    except TypeError:
+        return str(value)
+
+
+class EchoBuffer(object):
+    def write(self, value):
+        return value
+
+
+class LazyURLPatterns(Sequence):
+    def __init__(self, get_urlpatterns):
+        self.get_urlpatterns = get_urlpatterns
+
+    @cached_property
+    def patterns(self):
+        return list(self.get_urlpatterns())
+
+    def __getitem__(self, index):
+        return self.patterns[index]
+
+    def __len__(self):
+        return len(self.patterns)
+
+
+class LimitedNestedObjects(NestedObjects):
+    """
+    A NestedObjects collector that raises LimitReached as soon as it has loaded limit related objects,
+    counting the ones protecting the deletion too. It never loads more than limit of them.
+    """
+
+    class LimitReached(Exception):
+        pass
+
+    def __init__(self, *args, limit, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limit = limit
+        self.loaded = 0
+
+    def related_objects(self, related_model, related_fields, objs):
+        queryset = super().related_objects(related_model, related_fields, objs)
+        # SET_NULL and friends aren't loaded by the collector unless the objects are deleted.
+        if all(getattr(field.remote_field.on_delete, 'lazy_sub_objs', False) for field in related_fields):
+            return queryset
+
+        queryset = queryset[:self.limit - self.loaded]
+        self.loaded += len(queryset)
+        if self.loaded >= self.limit:
+            raise self.LimitReached
+        return queryset
+
+
+class LazyForeignKeyName(object):
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return None
+
+        fk_name = instance.__dict__['fk_name'] = _get_foreign_key(instance.parent_model, instance.model).name
+        return fk_name
+
+
+class LazySubAdminReceiver(object):
+    """
+    Receives the model signals of a subadmin below a lazy admin before it is instantiated. The subadmin is
+    instantiated, if it wasn't already, and the signal is handed to its model_changed().
+    """
+
+    def __init__(self, modeladmin, path):
+        self.modeladmin = modeladmin
+        self.path = path
+
+    def __call__(self, sender, **kwargs):
+        modeladmin = self.modeladmin
+        for modeladmin_class in self.path:
+            modeladmin = modeladmin.get_subadmin_instance(modeladmin_class)
+        modeladmin.model_changed(sender, **kwargs)
+
+
+class SubAdminRequestCache(object):
+    def __init__(self):
+        self.instances = {}
+        self.permissions = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_request(cls, request):
+        if request is None:
+            return cls()
+
+        cache = getattr(request, '_subadmin_cache', None)
+        if cache is None:
+            cache = request._subadmin_cache = cls()
+        return cache
+
+    def get_instance(self, model, pk):
+        obj = self.instances.get((model, pk))
+        if obj is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return obj
+
+    def set_instance(self, model, obj):
+        self.instances[(model, obj.pk)] = obj
+
+    def get_permission_key(self, modeladmin, perm, obj=None):
+        return (modeladmin, perm, None if obj is None else obj.pk)
+
+    def has_permission(self, request, modeladmin, perm, obj=None):
+        key = self.get_permission_key(modeladmin, perm, obj)
+        if key not in self.permissions:
+            if perm == 'add':
+                self.permissions[key] = modeladmin.has_add_permission(request)
+            else:
+                self.permissions[key] = getattr(modeladmin, 'has_%s_permission' % perm)(request, obj)
+        return self.permissions[key]
+
+    def prefetch_permissions(self, request, modeladmin, checks):
+        checks = [check for check in checks if self.get_permission_key(*check) not in self.permissions]
+        if checks:
+            for check, result in modeladmin.get_permissions(request, checks).items():
+                self.permissions[self.get_permission_key(*check)] = result
+
+    async def aprefetch_permissions(self, request, modeladmin, checks):
+        checks = [check for check in checks if self.get_permission_key(*check) not in self.permissions]
+        if checks:
+            for check, result in (await modeladmin.aget_permissions(request, checks)).items():
+                self.permissions[self.get_permission_key(*check)] = result
+
+
+class SubAdminTimings(object):
+    def __init__(self):
+        self.phases = OrderedDict()
+
+    @classmethod
+    def for_request(cls, request):
+        if request is None:
+            return cls()
+
+        timings = getattr(request, '_subadmin_timings', None)
+        if timings is None:
+            timings = request._subadmin_timings = cls()
+        return timings
+
+    @contextmanager
+    def phase(self, modeladmin, request, name):
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(count_queries))
+                yield
+        finally:
+            self.add(modeladmin, request, name, time.perf_counter() - start, queries[0])
+
+    def add(self, modeladmin, request, name, duration, queries):
+        total_duration, total_queries = self.phases.get(name, (0, 0))
+        self.phases[name] = (total_duration + duration, total_queries + queries)
+        phase_finished.send(sender=type(modeladmin), modeladmin=modeladmin, request=request, phase=name,
+                            duration=duration, queries=queries)
+
+    def get_server_timing(self):
+        return ', '.join(
+            '%s;dur=%.1f;desc="queries: %d"' % (name, duration * 1000, queries)
+            for name, (duration, queries) in self.phases.items()
+        )
+
+    def finish(self, modeladmin, request, response):
+        if modeladmin.server_timing:
+            response['Server-Timing'] = self.get_server_timing()
+
+        logger.debug('%s %s: %s', request.method, request.path, ', '.join(
+            '%s %.1fms (%d queries)' % (name, duration * 1000, queries) for name, (duration, queries) in self.phases.items()
+        ))
+        view_finished.send(sender=type(modeladmin), modeladmin=modeladmin, request=request, response=response, timings=self)
 
 
 class SubAdminHelper(object):
-    def __init__(self, sub_admin, view_args, object_id=None):
+    def __init__(self, sub_admin, view_args, object_id=None, request=None, load=True):
         self.parents = []
         self.lookup_kwargs = {}
+        self.parent_lookup_kwargs = {}
         self.related_instances = OrderedDict()
+        self.tree_verified = True
+        self.sub_admin = sub_admin
         self.object_id = object_id
         self.view_args = view_args
-        self.base_viewname = sub_admin.get_base_viewname()
-        self.load_tree(sub_admin)
+        self.request = request
+        self.cache = SubAdminRequestCache.for_request(request)
+        self.base_viewname = sub_admin.base_viewname
+        self.urls = {}
+        self.batched_delete = None
+        if load:
+            self.load_tree(sub_admin)
 
     def load_tree(self, sub_admin):
-        parent_admin = sub_admin.parent_admin
-        fk_lookup = sub_admin.fk_name
+        with sub_admin.instrument(self.request, 'tree'):
+            levels = self.get_tree_levels(sub_admin)
+            objects = self.get_cached_tree(levels)
+
+            if objects is None:
+                if self.can_join_tree(levels):
+                    objects = self.fetch_tree(levels)
+                else:
+                    objects = [modeladmin.get_parent_instance(parent_id) for modeladmin, parent_id in levels]
+
+                for (modeladmin, parent_id), obj in zip(levels, objects):
+                    self.cache.set_instance(modeladmin.parent_model, obj)
+                    modeladmin.cache_parent_instance(obj)
+
+            self.verify_tree(levels, objects)
+            self.set_tree(levels, objects)
+
+        with sub_admin.instrument(self.request, 'permissions'):
+            self.cache.prefetch_permissions(self.request, sub_admin, self.get_permission_checks())
+
+    async def aload_tree(self, sub_admin):
+        levels = self.get_tree_levels(sub_admin)
+        objects = await self.aget_cached_tree(levels)
+
+        if objects is None:
+            if self.can_join_tree(levels):
+                objects = await self.afetch_tree(levels)
+            else:
+                objects = [await modeladmin.aget_parent_instance(parent_id) for modeladmin, parent_id in levels]
+
+            for (modeladmin, parent_id), obj in zip(levels, objects):
+                self.cache.set_instance(modeladmin.parent_model, obj)
+                await modeladmin.acache_parent_instance(obj)
+
+        self.verify_tree(levels, objects)
+        self.set_tree(levels, objects)
+        await self.cache.aprefetch_permissions(self.request, sub_admin, self.get_permission_checks())
+
+    def get_permission_checks(self):
+        checks = [(self.sub_admin, perm, None) for perm in ('view', 'add', 'change', 'delete')]
+        for parent in self.parents:
+            checks += [(parent['admin'], 'view', None), (parent['admin'], 'view', parent['object'])]
+        return checks
+
+    def get_tree_levels(self, sub_admin):
+        levels = []
 
         i = 2 if self.object_id else 1
-        while parent_admin:
-            obj = sub_admin.get_parent_instance(self.view_args[-i])
+        while getattr(sub_admin, 'parent_admin', None):
+            levels.append((sub_admin, self.view_args[-i]))
+            sub_admin = sub_admin.parent_admin
+            i += 1
+
+        return levels
+
+    def get_parent_pk(self, modeladmin, parent_id):
+        try:
+            return modeladmin.parent_model._meta.pk.to_python(unquote(parent_id))
+        except ValidationError:
+            raise Http404
+
+    def get_cached_tree(self, levels):
+        objects = []
+
+        for modeladmin, parent_id in levels:
+            pk = self.get_parent_pk(modeladmin, parent_id)
+            obj = self.cache.get_instance(modeladmin.parent_model, pk)
+            if obj is None:
+                obj = modeladmin.get_cached_parent_instance(pk)
+                if obj is None:
+                    return None
+                self.cache.set_instance(modeladmin.parent_model, obj)
+            objects.append(obj)
+
+        return objects
+
+    async def aget_cached_tree(self, levels):
+        objects = []
+
+        for modeladmin, parent_id in levels:
+            pk = self.get_parent_pk(modeladmin, parent_id)
+            obj = self.cache.get_instance(modeladmin.parent_model, pk)
+            if obj is None:
+                obj = await modeladmin.aget_cached_parent_instance(pk)
+                if obj is None:
+                    return None
+                self.cache.set_instance(modeladmin.parent_model, obj)
+            objects.append(obj)
+
+        return objects
+
+    def can_join_tree(self, levels):
+        for modeladmin, parent_id in levels:
+            if type(modeladmin).get_parent_instance is not SubAdminMixin.get_parent_instance:
+                return False
+
+        for modeladmin, parent_id in levels[1:]:
+            field = modeladmin.model._meta.get_field(modeladmin.fk_name)
+            if not (field.concrete and (field.many_to_one or field.one_to_one)):
+                return False
+
+            # Joined ancestors don't go through their default manager, so one that filters its queryset
+            # (soft deletion, tenants) has to be fetched on its own.
+            if type(modeladmin.parent_model._default_manager).get_queryset is not Manager.get_queryset:
+                return False
+
+        return True
+
+    def fetch_tree(self, levels):
+        modeladmin, parent_id = levels[0]
+        queryset = modeladmin.parent_model._default_manager.all()
+        if len(levels) > 1:
+            queryset = queryset.select_related('__'.join(modeladmin.fk_name for modeladmin, parent_id in levels[1:]))
+
+        obj = get_object_or_404(queryset, pk=unquote(parent_id))
+        objects = [obj]
+
+        for modeladmin, parent_id in levels[1:]:
+            obj = getattr(obj, modeladmin.fk_name)
+            if obj is None:
+                raise Http404
+            objects.append(obj)
+
+        return objects
+
+    async def afetch_tree(self, levels):
+        modeladmin, parent_id = levels[0]
+        queryset = modeladmin.parent_model._default_manager.all()
+        if len(levels) > 1:
+            queryset = queryset.select_related('__'.join(modeladmin.fk_name for modeladmin, parent_id in levels[1:]))
+
+        try:
+            obj = await queryset.aget(pk=unquote(parent_id))
+        except queryset.model.DoesNotExist:
+            raise Http404
+        objects = [obj]
+
+        for modeladmin, parent_id in levels[1:]:
+            obj = getattr(obj, modeladmin.fk_name)
+            if obj is None:
+                raise Http404
+            objects.append(obj)
+
+        return objects
+
+    def verify_tree(self, levels, objects):
+        for (modeladmin, parent_id), obj in zip(levels, objects):
+            if obj.pk != self.get_parent_pk(modeladmin, parent_id):
+                raise Http404
+
+        for (modeladmin, parent_id), child, obj in zip(levels[1:], objects, objects[1:]):
+            field = modeladmin.model._meta.get_field(modeladmin.fk_name)
+            if not (field.concrete and (field.many_to_one or field.one_to_one)):
+                self.tree_verified = False
+                continue
+            if getattr(child, field.attname) != getattr(obj, field.target_field.attname):
+                raise Http404
+
+    def set_tree(self, levels, objects):
+        fk_lookup = None
+
+        for (modeladmin, parent_id), obj in zip(levels, objects):
+            fk_lookup = modeladmin.fk_name if fk_lookup is None else '%s__%s' % (fk_lookup, modeladmin.fk_name)
             self.parents.append({
-                'admin': parent_admin,
+                'admin': modeladmin.parent_admin,
                 'object': obj,
             })
             self.lookup_kwargs[fk_lookup] = obj
-            self.related_instances[sub_admin.fk_name] = obj
+            self.related_instances[modeladmin.fk_name] = obj
 
-            sub_admin = parent_admin
-            parent_admin = getattr(sub_admin, 'parent_admin', None)
-            if parent_admin:
-                fk_lookup = '%s__%s' % (fk_lookup, sub_admin.fk_name)
-
-            i += 1
+        if objects:
+            self.parent_lookup_kwargs[levels[0][0].fk_name] = objects[0]
 
     @cached_property
     def parent(self):
@@ -76,18 +481,256 @@ class SubAdminHelper(object):
     def base_url_args(self):
         return [unquote(arg) for arg in self.view_args]
 
+    @cached_property
+    def url_args(self):
+        return self.base_url_args[:-1] if self.object_id else self.base_url_args
+
+    def get_url(self, viewname, *args, **kwargs):
+        if kwargs:
+            return self.sub_admin.reverse_url(viewname, *self.url_args + list(args), **kwargs)
+
+        key = (viewname,) + args
+        if key not in self.urls:
+            self.urls[key] = self.sub_admin.reverse_url(viewname, *self.url_args + list(args))
+        return self.urls[key]
+
+    @cached_property
+    def breadcrumbs(self):
+        permissions = [
+            (self.cache.has_permission(self.request, parent['admin'], 'view'),
+             self.cache.has_permission(self.request, parent['admin'], 'view', parent['object']))
+            for parent in self.parents[::-1]
+        ]
+
+        cache = self.sub_admin.get_breadcrumbs_cache()
+        if cache is None:
+            return self.get_breadcrumbs(permissions)
+
+        cache_key = self.get_breadcrumbs_cache_key(permissions)
+        breadcrumbs = cache.get(cache_key)
+        if breadcrumbs is None:
+            breadcrumbs = self.get_breadcrumbs(permissions)
+            cache.set(cache_key, breadcrumbs, self.sub_admin.breadcrumbs_cache_timeout)
+        return breadcrumbs
+
+    def get_breadcrumbs_cache_key(self, permissions):
+        # Ancestors' names are part of the key, so renaming one of them doesn't leave stale breadcrumbs behind.
+        names = [force_str(parent['object']) for parent in self.parents]
+        key = repr((
+            self.sub_admin.admin_site.name, get_script_prefix(), get_urlconf(), get_language(),
+            self.view_args[:len(self.parents)], names, permissions,
+        ))
+        return 'subadmin:breadcrumbs:%s:%s' % (self.base_viewname, hashlib.md5(key.encode()).hexdigest())
+
+    def get_breadcrumbs(self, permissions):
+        root_opts = self.root['object']._meta
+        breadcrumbs = {
+            'root': {
+                'name': root_opts.app_config.verbose_name,
+                'url': reverse('admin:app_list', kwargs={'app_label': root_opts.app_label},
+                               current_app=self.sub_admin.admin_site.name),
+            },
+            'breadcrumbs': [],
+        }
+
+        view_args = list(self.view_args)
+        for i, (parent, (has_view_permission, has_object_view_permission)) in enumerate(zip(self.parents[::-1], permissions)):
+            adm = parent['admin']
+            obj = parent['object']
+
+            breadcrumbs['breadcrumbs'].extend([{
+                'name': obj._meta.verbose_name_plural,
+                'url': adm.reverse_url('changelist', *view_args[:i]),
+                'has_view_permission': has_view_permission,
+            }, {
+                'name': force_str(obj),
+                'url': adm.reverse_url('change', *view_args[:i + 1]),
+                'has_view_permission': has_object_view_permission,
+            }])
+
+        return breadcrumbs
+
 
 class SubAdminChangeList(ChangeList):
+    keyset_pagination = False
+    result_count_capped = False
+    first_page_url = previous_page_url = next_page_url = None
+    results_cache_key = None
+    cached_results = None
+    cached_results_attrs = (
+        'result_count', 'full_result_count', 'show_full_result_count', 'show_admin_actions', 'can_show_all',
+        'multi_page', 'keyset_pagination', 'result_count_capped', 'first_page_url', 'previous_page_url',
+        'next_page_url',
+    )
+
     def __init__(self, request, *args, **kwargs):
         super().__init__(request, *args, **kwargs)
         self.request = request
 
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        cursor = self.params.pop(CURSOR_VAR, None)
+        get_cache_key = getattr(self.model_admin, 'get_changelist_cache_key', None)
+        self.results_cache_key = get_cache_key(request, self) if get_cache_key else None
+
+        if self.results_cache_key is not None:
+            cached = self.model_admin.get_changelist_cache().get(self.results_cache_key)
+            if cached is not None:
+                return self.load_cached_results(request, cached)
+
+        self.get_page_results(request, cursor)
+
+    def load_cached_results(self, request, cached):
+        """
+        Restore the counts and page links of a cached result table instead of querying them. The rows
+        themselves aren't needed, the table is rendered from the cache.
+        """
+        for attr in self.cached_results_attrs:
+            setattr(self, attr, cached[attr])
+
+        self.cached_results = mark_safe(cached['html'])
+        self.result_list = self.queryset.none()
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.paginator.count = self.result_count
+
+    def cache_results(self, html):
+        cached = {attr: getattr(self, attr) for attr in self.cached_results_attrs}
+        cached['html'] = str(html)
+        self.model_admin.get_changelist_cache().set(
+            self.results_cache_key, cached, self.model_admin.changelist_cache_timeout)
+
+    def get_page_results(self, request, cursor):
+        keys = self.get_keyset_keys() if getattr(self.model_admin, 'keyset_pagination', False) else None
+        if keys is None:
+            super().get_results(request)
+            self.model_admin.prepare_results(request, list(self.result_list))
+            return
+
+        direction, values = self.decode_cursor(keys, cursor) if cursor else ('n', None)
+        reverse = direction == 'p'
+        rows = list(self.get_keyset_queryset(keys, values, reverse)[:self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if reverse:
+            rows.reverse()
+        self.model_admin.prepare_results(request, rows)
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else cursor is not None
+
+        result_list = self.get_keyset_queryset(keys, None, False)[:self.list_per_page]
+        result_list._result_cache = rows
+        result_list._prefetch_done = True
+
+        self.result_count, self.result_count_capped = self.model_admin.get_keyset_result_count(request, self.queryset)
+        if self.model_admin.show_full_result_count:
+            full_result_count, full_result_count_capped = self.model_admin.get_keyset_result_count(
+                request, self.root_queryset)
+        else:
+            full_result_count, full_result_count_capped = None, False
+
+        self.show_full_result_count = self.model_admin.show_full_result_count and not full_result_count_capped
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = has_next or has_previous
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.keyset_pagination = True
+
+        if has_previous:
+            self.first_page_url = self.get_query_string(remove=[PAGE_VAR])
+            self.previous_page_url = self.get_cursor_url('p', keys, rows[0])
+        if has_next and rows:
+            self.next_page_url = self.get_cursor_url('n', keys, rows[-1])
+
+    def get_keyset_keys(self):
+        """
+        Return the (field, descending) pairs the changelist is ordered by, ending with the primary key, or
+        None when the ordering can't be used to seek (expressions, lookups across relations, nullable fields).
+        """
+        keys = []
+        for name in self.queryset.query.order_by:
+            if not isinstance(name, str) or name == '?':
+                return None
+
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            try:
+                field = self.opts.pk if name == 'pk' else self.opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+
+            if not field.concrete or field.null or (field.is_relation and name != field.attname):
+                return None
+
+            # get_ordering() repeats the admin's ordering when get_queryset() is ordered too, a field already
+            # ordered by decides the order on its own.
+            if any(key is field for key, _ in keys):
+                continue
+
+            keys.append((field, descending))
+            if field.primary_key:
+                return keys
+
+        return keys + [(self.opts.pk, keys[-1][1] if keys else True)]
+
+    def get_keyset_queryset(self, keys, values, reverse):
+        queryset = self.queryset.order_by(*[
+            ('-' if descending != reverse else '') + field.attname for field, descending in keys
+        ])
+        if values is None:
+            return queryset
+
+        seek = Q()
+        for i, (field, descending) in enumerate(keys):
+            condition = Q(**{field.attname: value for (field, _), value in zip(keys[:i], values)})
+            condition &= Q(**{'%s__%s' % (field.attname, 'lt' if descending != reverse else 'gt'): values[i]})
+            seek |= condition
+        return queryset.filter(seek)
+
+    def encode_cursor(self, direction, keys, result):
+        data = json.dumps([direction] + [field.value_to_string(result) for field, _ in keys])
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, keys, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+            direction, values = data[0], data[1:]
+            if direction not in ('n', 'p') or len(values) != len(keys):
+                raise ValueError(cursor)
+            return direction, [field.to_python(value) for (field, _), value in zip(keys, values)]
+        except (ValueError, TypeError, IndexError, ValidationError) as e:
+            raise IncorrectLookupParameters(e)
+
+    def get_cursor_url(self, direction, keys, result):
+        return self.get_query_string({CURSOR_VAR: self.encode_cursor(direction, keys, result)}, [PAGE_VAR])
+
+    @cached_property
+    def result_url(self):
+        return self.model_admin.get_url_builder('change', *self.model_admin.get_base_url_args(self.request))
+
     def url_for_result(self, result):
-        pk = getattr(result, self.pk_attname)
-        return self.model_admin.reverse_url('change', *self.model_admin.get_base_url_args(self.request) + [pk])
+        return self.result_url(quote(getattr(result, self.pk_attname)))
+
+    def get_result_urls(self, results=None):
+        results = self.result_list if results is None else results
+        return OrderedDict((getattr(result, self.pk_attname), self.url_for_result(result)) for result in results)
 
 
 class SubAdminFormMixin(object):
+    _related_instances = {}
+
+    def __init__(self, *args, related_instances=None, defer_unique_checks=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if related_instances is not None:
+            self._related_instances = related_instances
+        self.defer_unique_checks = defer_unique_checks
+
     def _post_clean(self):
         validate_unique = self._validate_unique
         self._validate_unique = False
@@ -97,7 +740,7 @@ class SubAdminFormMixin(object):
             setattr(self.instance, fk_field, fk_instance)
 
         self._validate_unique = validate_unique
-        if self._validate_unique:
+        if self._validate_unique and not self.defer_unique_checks:
             self.validate_unique()
 
 
@@ -121,11 +764,122 @@ class SubAdminFormMixin(object):
 
 class SubAdminBase(object):
     subadmins = None
+    lazy_subadmins = None
+    subadmin_link_counts = False
+    subadmin_link_counts_cache = None
+    subadmin_link_counts_timeout = 60
+    subadmin_link_counts_per_user = True
+    inherited_prefetch_related = ()
+    instrumentation = False
+    instrumentation_class = SubAdminTimings
+    server_timing = False
+    subadmin_url_converters = {
+        'AutoField': 'int',
+        'BigAutoField': 'int',
+        'SmallAutoField': 'int',
+        'PositiveIntegerField': 'int',
+        'PositiveBigIntegerField': 'int',
+        'PositiveSmallIntegerField': 'int',
+        'UUIDField': 'uuid',
+        'SlugField': 'slug',
+    }
 
     def get_subadmin_instances(self):
         return [modeladmin_class(self.model, self) for modeladmin_class in self.subadmins or []]
 
+    def load_subadmin_instances(self):
+        start = time.perf_counter()
+        subadmin_instances = self.get_subadmin_instances()
+        self.subadmin_instances_loaded(subadmin_instances, time.perf_counter() - start)
+        return subadmin_instances
+
+    @cached_property
+    def subadmin_instances(self):
+        return self.load_subadmin_instances()
+
+    def subadmin_instances_loaded(self, subadmin_instances, duration):
+        logger.debug('%s loaded %d subadmins in %.2fms', type(self).__name__, len(subadmin_instances), duration * 1000)
+
+    def get_subadmin_instance(self, modeladmin_class):
+        for modeladmin in self.subadmin_instances:
+            if type(modeladmin) is modeladmin_class:
+                return modeladmin
+        raise LookupError('%s is not a subadmin of %s' % (modeladmin_class.__name__, type(self).__name__))
+
+    def get_model_chain(self):
+        """
+        Return the models of this admin and of its ancestors, from this admin up to the root.
+        """
+        models = [self.model]
+        modeladmin = self
+        while getattr(modeladmin, 'parent_admin', None):
+            modeladmin = modeladmin.parent_admin
+            models.append(modeladmin.model)
+        return models
+
+    def is_lazily_loaded(self):
+        modeladmin = getattr(self, 'parent_admin', None)
+        while modeladmin is not None:
+            if modeladmin.lazy_subadmins:
+                return True
+            modeladmin = getattr(modeladmin, 'parent_admin', None)
+        return False
+
+    def connect_lazy_subadmin_receivers(self):
+        """
+        Connect the model signals of every subadmin below this admin to receivers that instantiate it on
+        demand, so caches shared with other processes are invalidated even before it is loaded here.
+        """
+        self.lazy_receivers = []
+        pending = [((modeladmin_class,), self.get_model_chain()) for modeladmin_class in self.subadmins or []]
+
+        while pending:
+            path, parent_models = pending.pop()
+            modeladmin_class = path[-1]
+
+            senders = modeladmin_class.get_signal_senders(parent_models)
+            if senders:
+                receiver = LazySubAdminReceiver(self, path)
+                self.lazy_receivers.append(receiver)
+                for signal, model in senders:
+                    signal.connect(receiver, sender=model)
+
+            pending += [
+                (path + (subadmin_class,), [modeladmin_class.model] + parent_models)
+                for subadmin_class in modeladmin_class.subadmins or []
+            ]
+
+    def get_lazy_subadmin_urls(self):
+        urlpatterns = []
+
+        for modeladmin_class in self.subadmins or []:
+            regex = r'^(.+)/%s/' % modeladmin_class.model._meta.model_name
+            urls = LazyURLPatterns(lambda modeladmin_class=modeladmin_class: self.get_subadmin_instance(modeladmin_class).urls)
+            urlpatterns.append(re_path(regex, include(urls)))
+
+        return urlpatterns
+
+    def get_subadmin_url_converter(self):
+        pk = self.model._meta.pk
+        if pk.is_relation:
+            pk = pk.target_field
+        return self.subadmin_url_converters.get(pk.get_internal_type(), 'str')
+
+    def get_flat_subadmin_urls(self, route='', level=0):
+        urlpatterns = []
+        converter = self.get_subadmin_url_converter()
+
+        for modeladmin in self.subadmin_instances:
+            subadmin_route = '%s<%s:parent_%d>/%s/' % (route, converter, level, modeladmin.model._meta.model_name)
+            urlpatterns += modeladmin.get_flat_subadmin_urls(subadmin_route, level + 1)
+            urlpatterns += modeladmin.get_flat_urls(subadmin_route)
+
+        return urlpatterns
+
     def get_subadmin_urls(self):
+        if self.lazy_subadmins:
+            return self.get_lazy_subadmin_urls()
+
         urlpatterns = []
 
         for modeladmin in self.subadmin_instances:
@@ -139,16 +893,156 @@ class SubAdminBase(object):
 
         return urlpatterns
 
+    @cached_property
+    def url_templates(self):
+        return {}
+
+    def get_url_template(self, viewname, nargs):
+        """
+        Return the format, parameters, converters and regex reverse() would use for viewname with nargs
+        positional arguments, read from the resolver once per URLconf, script prefix and language. Return None
+        when they can't be found, e.g. when the admin site is included below another namespace.
+        """
+        key = (get_urlconf(), get_script_prefix(), get_language(), viewname, nargs)
+        if key in self.url_templates:
+            return self.url_templates[key]
+
+        template = None
+        resolver = get_resolver(get_urlconf())
+        if self.admin_site.name in resolver.namespace_dict:
+            ns_pattern, ns_resolver = resolver.namespace_dict[self.admin_site.name]
+            ns_resolver = get_ns_resolver(ns_pattern, ns_resolver, tuple(ns_resolver.pattern.converters.items()))
+            prefix = get_script_prefix()
+            name = self.get_viewname(viewname).partition(':')[2]
+
+            for possibility, pattern, defaults, converters in ns_resolver.reverse_dict.getlist(name):
+                for result, params in possibility:
+                    if len(params) == nargs:
+                        regex = re.compile('^%s%s' % (re.escape(prefix), pattern))
+                        template = (prefix.replace('%', '%%') + result, params, converters, regex)
+                        break
+                if template is not None:
+                    break
+
+        self.url_templates[key] = template
+        return template
+
+    def reverse_url(self, viewname, *args, **kwargs):
+        template = None if kwargs else self.get_url_template(viewname, len(args))
+        url = None if template is None else format_url_template(template, args)
+        if url is None:
+            return reverse(self.get_viewname(viewname), args=args, kwargs=kwargs, current_app=self.admin_site.name)
+        return url
+
+    def get_url_builder(self, viewname, *args):
+        template = self.get_url_template(viewname, len(args) + 1)
+        if template is None:
+            return partial(self.reverse_url, viewname, *args)
+
+        def build(arg):
+            url = format_url_template(template, args + (arg,))
+            if url is None:
+                return self.reverse_url(viewname, *args, arg)
+            return url
+        return build
+
+    def instrument(self, request, phase):
+        if not self.instrumentation:
+            return nullcontext()
+        return self.instrumentation_class.for_request(request).phase(self, request, phase)
+
+    def instrument_view(self, view):
+        def wrapper(request, *args, **kwargs):
+            with self.instrument(request, 'view'):
+                response = view(request, *args, **kwargs)
+
+            timings = self.instrumentation_class.for_request(request)
+            if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+                render = response.render
+
+                def timed_render():
+                    with self.instrument(request, 'render'):
+                        render()
+                    timings.finish(self, request, response)
+                    return response
+                response.render = timed_render
+            else:
+                timings.finish(self, request, response)
+            return response
+        return update_wrapper(wrapper, view)
+
+    def has_cached_permission(self, request, perm, obj=None):
+        return SubAdminRequestCache.for_request(request).has_permission(request, self, perm, obj)
+
+    def get_permissions(self, request, checks):
+        return {}
+
+    async def aget_permissions(self, request, checks):
+        if type(self).get_permissions is SubAdminBase.get_permissions:
+            return {}
+        return await sync_to_async(self.get_permissions)(request, checks)
+
+    def get_subadmin_link_counts(self, request, obj, subadmin_instances):
+        view_args = request.subadmin.view_args if hasattr(request, 'subadmin') else (quote(str(obj.pk)),)
+
+        cache = self.get_subadmin_link_counts_cache()
+        if cache is not None:
+            key = repr((
+                self.admin_site.name, tuple(view_args),
+                request.user.pk if self.subadmin_link_counts_per_user else None,
+            ))
+            cache_key = 'subadmin:counts:%s:%s' % (self.model._meta.label_lower, hashlib.md5(key.encode()).hexdigest())
+            counts = cache.get(cache_key)
+            if counts is not None and all(modeladmin.base_viewname in counts for modeladmin in subadmin_instances):
+                return counts
+
+        SubAdminRequestCache.for_request(request).set_instance(self.model, obj)
+        subadmin = getattr(request, 'subadmin', None)
+        annotations = {}
+
+        try:
+            for i, modeladmin in enumerate(subadmin_instances):
+                request.subadmin = modeladmin.get_subadmin_helper(view_args, request=request)
+                queryset = modeladmin.get_queryset(request).order_by().values(modeladmin.fk_name)
+                annotations['subadmin_count_%d' % i] = Subquery(queryset.annotate(count=Count('pk')).values('count'))
+        finally:
+            if subadmin is None:
+                vars(request).pop('subadmin', None)
+            else:
+                request.subadmin = subadmin
+
+        row = self.model._default_manager.filter(pk=obj.pk).annotate(**annotations).values_list(*annotations).get()
+        counts = {modeladmin.base_viewname: count or 0 for modeladmin, count in zip(subadmin_instances, row)}
+
+        if cache is not None:
+            cache.set(cache_key, counts, self.subadmin_link_counts_timeout)
+        return counts
+
+    def get_subadmin_link_counts_cache(self):
+        if self.subadmin_link_counts_cache is None:
+            return None
+        return caches[self.subadmin_link_counts_cache]
+
     def render_change_form(self, request, context, add=False, change=False, form_url='', obj=None):
         subadmin_links = []
         if obj:
-            for modeladmin in self.subadmin_instances:
-                if modeladmin.has_change_permission(request):
-                    url_args = modeladmin.get_base_url_args(request) or [obj.pk]
-                    subadmin_links.append({
-                        'name': modeladmin.model._meta.verbose_name_plural,
-                        'url': modeladmin.reverse_url('changelist', *url_args),
-                    })
+            checks = [(modeladmin, 'change', None) for modeladmin in self.subadmin_instances]
+            SubAdminRequestCache.for_request(request).prefetch_permissions(request, self, checks)
+
+            subadmin_instances = [
+                modeladmin for modeladmin in self.subadmin_instances if modeladmin.has_cached_permission(request, 'change')
+            ]
+            counts = {}
+            if self.subadmin_link_counts and subadmin_instances:
+                counts = self.get_subadmin_link_counts(request, obj, subadmin_instances)
+
+            for modeladmin in subadmin_instances:
+                url_args = modeladmin.get_base_url_args(request) or [obj.pk]
+                subadmin_links.append({
+                    'name': modeladmin.model._meta.verbose_name_plural,
+                    'url': modeladmin.reverse_url('changelist', *url_args),
+                    'count': counts.get(modeladmin.base_viewname),
+                })
 
         context.update({'subadmin_links': subadmin_links})
         return super().render_change_form(request, context, add=add, change=change,
@@ -157,7 +1051,7 @@ class SubAdminBase(object):
 
 class SubAdminMixin(SubAdminBase):
     model = None
-    fk_name = None
+    fk_name = LazyForeignKeyName()
 
     change_list_template = 'subadmin/change_list.html'
     change_form_template = 'subadmin/change_form.html'
@@ -165,20 +1059,95 @@ class SubAdminMixin(SubAdminBase):
     delete_selected_confirmation_template = 'subadmin/delete_selected_confirmation.html'
     object_history_template = 'subadmin/object_history.html'
     subadmin_helper_class = SubAdminHelper
+    parent_cache = None
+    parent_cache_timeout = 300
+    breadcrumbs_cache = None
+    breadcrumbs_cache_timeout = 300
+    direct_parent_lookup = False
+    export_formats = ()
+    export_chunk_size = 2000
+    subadmin_autocomplete_fields = ()
+    search_backend = None
+    list_prefetch_related = ()
+    changelist_cache = None
+    changelist_cache_timeout = 300
+    changelist_cache_per_user = True
+    bulk_add = False
+    bulk_add_template = None
+    bulk_add_extra = 10
+    bulk_add_max_rows = 1000
+    bulk_add_batch_size = 500
+    delete_batch_size = None
+    fast_delete_batches = False
+    delete_summary_threshold = None
+    delete_summary_max_objects = 100
+    keyset_pagination = False
+    keyset_count_limit = 1000
+    async_views = False
 
     def __init__(self, parent_model, parent_admin):
         self.parent_model = parent_model
         self.parent_admin = parent_admin
 
-        if self.fk_name is None:
-            self.fk_name = _get_foreign_key(parent_model, self.model).name
+        if self.lazy_subadmins is None:
+            self.lazy_subadmins = parent_admin.lazy_subadmins
 
         super().__init__(self.model, parent_admin.admin_site)
 
-        self.subadmin_instances = self.get_subadmin_instances()
-
-    def get_subadmin_helper(self, view_args, object_id=None):
-        return self.subadmin_helper_class(self, view_args, object_id=object_id)
+        self.base_viewname = self.get_base_viewname()
+        self._subadmin_form_classes = {}
+        self.form = self.get_subadmin_form_class(self.form)
+        if not self.lazy_subadmins:
+            self.subadmin_instances = self.load_subadmin_instances()
+        self._search_backend = self.search_backend(self) if self.search_backend else None
+        if not self.is_lazily_loaded():
+            self.connect_model_signals()
+            if self.lazy_subadmins:
+                self.connect_lazy_subadmin_receivers()
+
+    def get_subadmin_helper(self, view_args, object_id=None, request=None):
+        helper = getattr(request, 'subadmin', None)
+        if helper is not None and helper.sub_admin is self and helper.view_args == view_args and helper.object_id == object_id:
+            return helper
+        return self.subadmin_helper_class(self, view_args, object_id=object_id, request=request)
+
+    async def aget_subadmin_helper(self, view_args, object_id=None, request=None):
+        helper = getattr(request, 'subadmin', None)
+        if helper is not None and helper.sub_admin is self and helper.view_args == view_args and helper.object_id == object_id:
+            return helper
+
+        helper = self.subadmin_helper_class(self, view_args, object_id=object_id, request=request, load=False)
+        await helper.aload_tree(self)
+        return helper
+
+    async def aprepare_view(self, request, view_args, object_id=None):
+        """
+        Load the user, their permissions and the parent chain of the view on the event loop, so that the
+        synchronous view reuses them instead of querying the database from a worker thread.
+        """
+        auser = getattr(request, 'auser', None)
+        if auser is None:
+            return
+
+        request.user = user = await auser()
+        if not self.admin_site.has_permission(request):
+            return
+
+        if hasattr(user, 'aget_all_permissions'):
+            await user.aget_all_permissions()
+        request.subadmin = await self.aget_subadmin_helper(view_args, object_id=object_id, request=request)
+
+    def get_changelist_instance(self, request):
+        with self.instrument(request, 'changelist'):
+            return super().get_changelist_instance(request)
+
+    def wrap_async_view(self, view, object_view=False):
+        admin_view = sync_to_async(view)
+
+        async def wrapper(request, *args):
+            await self.aprepare_view(request, args, object_id=args[-1] if object_view else None)
+            return await admin_view(request, *args)
+        return wrapper
 
     def get_model_perms(self, request):
         return super().get_model_perms(request)
@@ -187,7 +1156,10 @@ class SubAdminMixin(SubAdminBase):
         actions = super().get_actions(request)
 
         def subadmin_delete_selected(modeladmin, req, qs):
-            response = delete_selected(modeladmin, req, qs)
+            if self.delete_batch_size and req.POST.get('post'):
+                response = self.delete_selected_in_batches(req, qs)
+            else:
+                response = delete_selected(modeladmin, req, qs)
             if response:
                 response.context_data.update(self.context_add_parent_data(request))
             return response
@@ -195,64 +1167,742 @@ class SubAdminMixin(SubAdminBase):
         if 'delete_selected' in actions:
             actions['delete_selected'] = (subadmin_delete_selected, 'delete_selected', actions['delete_selected'][2])
 
+        if self.export_formats and self.actions is not None and IS_POPUP_VAR not in request.GET:
+            if self.has_view_or_change_permission(request):
+                for export_format in self.export_formats:
+                    name = 'export_%s' % export_format
+                    description = _('Export selected %%(verbose_name_plural)s as %(format)s') % {'format': export_format.upper()}
+                    actions[name] = (partial(self.export_action, export_format=export_format), name, description)
+
         return actions
 
+    def delete_selected_in_batches(self, request, queryset):
+        """
+        The confirmed step of the delete_selected action for a delete_batch_size subadmin. It does what
+        Django's action does, but tells the user how many objects were deleted in how many batches.
+        """
+        deletable_objects, model_count, perms_needed, protected = self.get_deleted_objects(queryset, request)
+        if protected:
+            return delete_selected(self, request, queryset)
+        if perms_needed:
+            raise PermissionDenied
+
+        if len(queryset):
+            if hasattr(self, 'log_deletions'):
+                self.log_deletions(request, queryset)
+            else:
+                for obj in queryset:
+                    self.log_deletion(request, obj, str(obj))
+            self.delete_queryset(request, queryset)
+
+            count, batches = request.subadmin.batched_delete
+            self.message_user(request, ngettext(
+                'Successfully deleted %(count)d %(items)s in %(batches)d batch.',
+                'Successfully deleted %(count)d %(items)s in %(batches)d batches.',
+                batches,
+            ) % {'count': count, 'items': model_ngettext(self.opts, count), 'batches': batches}, messages.SUCCESS)
+        return None
+
+    def delete_queryset(self, request, queryset):
+        if not self.delete_batch_size:
+            return super().delete_queryset(request, queryset)
+
+        request.subadmin.batched_delete = self.delete_in_batches(request, queryset)
+        self.invalidate_parent_changelist(request)
+
+    def delete_in_batches(self, request, queryset):
+        model = queryset.model
+        using = queryset.db
+        pks = queryset.order_by('pk').values_list('pk', flat=True)
+        last_pk, count, batches = None, 0, 0
+
+        while True:
+            batch = list((pks if last_pk is None else pks.filter(pk__gt=last_pk))[:self.delete_batch_size])
+            if not batch:
+                break
+
+            with transaction.atomic(using=using):
+                batch_queryset = model._base_manager.using(using).filter(pk__in=batch)
+                if self.fast_delete_batches and Collector(using=using).can_fast_delete(batch_queryset):
+                    count += batch_queryset._raw_delete(using)
+                else:
+                    count += batch_queryset.delete()[1].get(model._meta.label, 0)
+
+            last_pk = batch[-1]
+            batches += 1
+            self.delete_batch_done(request, model, batches, count)
+
+        return count, batches
+
+    def delete_batch_done(self, request, model, batches, count):
+        logger.info('Deleted %d %s objects in %d batches', count, model._meta.label, batches)
+
+    def delete_model(self, request, obj):
+        if self.delete_batch_size:
+            # Delete the cascade in chunks first, so obj.delete() doesn't collect all of it at once.
+            count, batches = 0, 0
+            for relation, queryset in self.get_delete_relations(self.model._base_manager.filter(pk=obj.pk)):
+                if relation.on_delete is CASCADE:
+                    relation_count, relation_batches = self.delete_in_batches(request, queryset)
+                    count, batches = count + relation_count, batches + relation_batches
+            request.subadmin.batched_delete = (count, batches)
+        super().delete_model(request, obj)
+
+    def get_deleted_objects(self, objs, request):
+        """
+        Like ModelAdmin.get_deleted_objects(), but once delete_summary_threshold objects would be deleted
+        (or protect the deletion) the cascade is only counted per model, see get_delete_summary().
+        """
+        if self.delete_summary_threshold is None:
+            return super().get_deleted_objects(objs, request)
+
+        if isinstance(objs, QuerySet):
+            queryset, root_count = objs, objs.count()
+        else:
+            queryset, root_count = self.model._base_manager.filter(pk__in=[obj.pk for obj in objs]), len(objs)
+
+        if not root_count:
+            return super().get_deleted_objects(objs, request)
+
+        if root_count < self.delete_summary_threshold:
+            collector = LimitedNestedObjects(
+                using=router.db_for_write(self.model), limit=self.delete_summary_threshold - root_count,
+            )
+            try:
+                collector.collect(objs)
+            except LimitedNestedObjects.LimitReached:
+                pass
+            else:
+                return self.get_collected_deleted_objects(request, collector)
+
+        counts, protected = Counter(), Counter()
+        self.count_deleted_objects(queryset, counts, protected)
+        return self.get_delete_summary(request, queryset, root_count, counts, protected)
+
+    def get_collected_deleted_objects(self, request, collector):
+        """
+        Return what django.contrib.admin.utils.get_deleted_objects() does, from a collector that has already
+        collected the objects.
+        """
+        perms_needed = set()
+
+        def format_callback(obj):
+            opts = obj._meta
+            no_edit_link = '%s: %s' % (capfirst(opts.verbose_name), obj)
+            model_admin = self.admin_site._registry.get(type(obj))
+            if model_admin is None:
+                return no_edit_link
+
+            if not model_admin.has_delete_permission(request, obj):
+                perms_needed.add(opts.verbose_name)
+            try:
+                admin_url = reverse('%s:%s_%s_change' % (self.admin_site.name, opts.app_label, opts.model_name),
+                                    None, (quote(obj.pk),))
+            except NoReverseMatch:
+                return no_edit_link
+            return format_html('{}: <a href="{}">{}</a>', capfirst(opts.verbose_name), admin_url, obj)
+
+        to_delete = collector.nested(format_callback)
+        protected = [format_callback(obj) for obj in collector.protected]
+        model_count = {model._meta.verbose_name_plural: len(objs) for model, objs in collector.model_objs.items()}
+        return to_delete, model_count, perms_needed, protected
+
+    def get_delete_relations(self, queryset):
+        for relation in queryset.model._meta.related_objects:
+            if relation.many_to_many or relation.related_model._meta.auto_created:
+                continue
+            yield relation, relation.related_model._base_manager.filter(**{'%s__in' % relation.field.name: queryset})
+
+    def count_deleted_objects(self, queryset, counts, protected):
+        """
+        Count the objects deleting queryset would cascade to (and the ones protecting it) per model, with one
+        aggregate query per relation instead of collecting every object. Like the collector, RESTRICT only
+        protects queryset from objects that the cascade doesn't delete as well.
+        """
+        restricted, cascades = [], defaultdict(list)
+        cascades[queryset.model].append(queryset)
+        self.count_cascade(queryset, counts, protected, restricted, cascades)
+
+        for related_model, related_queryset in restricted:
+            for cascade in cascades[related_model]:
+                related_queryset = related_queryset.exclude(pk__in=cascade.values('pk'))
+            count = related_queryset.count()
+            if count:
+                protected[related_model] += count
+
+    def count_cascade(self, queryset, counts, protected, restricted, cascades, path=()):
+        for relation, related_queryset in self.get_delete_relations(queryset):
+            if relation in path or relation.on_delete not in (CASCADE, PROTECT, RESTRICT):
+                continue
+
+            if relation.on_delete is RESTRICT:
+                # Counted by count_deleted_objects() once the whole cascade is known.
+                restricted.append((relation.related_model, related_queryset))
+                continue
+
+            count = related_queryset.count()
+            if not count:
+                continue
+
+            if relation.on_delete is CASCADE:
+                counts[relation.related_model] += count
+                cascades[relation.related_model].append(related_queryset)
+                self.count_cascade(related_queryset, counts, protected, restricted, cascades, path + (relation,))
+            else:
+                protected[relation.related_model] += count
+
+    def get_delete_summary(self, request, queryset, root_count, counts, protected):
+        opts = self.model._meta
+        # Only the deleted objects themselves are listed, the cascade is summarized in model_count.
+        objects = ['%s: %s' % (capfirst(opts.verbose_name), obj) for obj in queryset[:self.delete_summary_max_objects]]
+        if root_count > len(objects):
+            objects.append(_('and %(count)d more %(items)s') % {
+                'count': root_count - len(objects), 'items': model_ngettext(opts, root_count - len(objects)),
+            })
+
+        perms_needed = set()
+        for model in [self.model] + list(counts):
+            model_admin = self.admin_site._registry.get(model, self if model is self.model else None)
+            if model_admin is not None and not model_admin.has_delete_permission(request):
+                perms_needed.add(model._meta.verbose_name)
+
+        model_count = {opts.verbose_name_plural: root_count}
+        for model, count in counts.items():
+            model_count[model._meta.verbose_name_plural] = model_count.get(model._meta.verbose_name_plural, 0) + count
+
+        protected = ['%d %s' % (count, model_ngettext(model._meta, count)) for model, count in protected.items()]
+        return objects, model_count, perms_needed, protected
+
+    def get_export_fields(self, request):
+        return [name for name in self.get_list_display(request) if name != 'action_checkbox']
+
+    def get_export_queryset(self, request, queryset, fields):
+        opts = self.model._meta
+        related_fields = []
+
+        for name in fields:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                related_fields.append(name)
+
+        if related_fields:
+            queryset = queryset.select_related(*related_fields)
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        return queryset
+
+    def get_export_rows(self, request, queryset, fields):
+        yield [str(label_for_field(name, self.model, self)) for name in fields]
+
+        for obj in queryset.iterator(chunk_size=self.export_chunk_size):
+            self.attach_parent_instances(request, [obj])
+            row = []
+            for name in fields:
+                try:
+                    f, attr, value = lookup_field(name, obj, self)
+                except (AttributeError, ObjectDoesNotExist):
+                    value = None
+                row.append(value)
+            yield row
+
+    def export_response(self, request, queryset, export_format):
+        fields = self.get_export_fields(request)
+        rows = self.get_export_rows(request, self.get_export_queryset(request, queryset, fields), fields)
+
+        if export_format == 'csv':
+            writer = csv.writer(EchoBuffer())
+            content = (writer.writerow(['' if value is None else str(value) for value in row]) for row in rows)
+            content_type = 'text/csv'
+        elif export_format == 'jsonl':
+            header = next(rows)
+            content = ('%s\n' % json.dumps(dict(zip(header, row)), default=export_json_default) for row in rows)
+            content_type = 'application/x-ndjson'
+        else:
+            raise Http404
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (self.model._meta.model_name, export_format)
+        return response
+
+    def export_action(self, modeladmin, request, queryset, export_format):
+        return self.export_response(request, queryset, export_format)
+
+    def export_view(self, request, *args, **kwargs):
+        request.subadmin = self.get_subadmin_helper(args, request=request)
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+
+        export_format = request.GET.get('format', self.export_formats[0])
+        if export_format not in self.export_formats:
+            raise Http404
+        return self.export_response(request, self.get_queryset(request), export_format)
+
+    def bulk_add_view(self, request, *args, **kwargs):
+        request.subadmin = self.get_subadmin_helper(args, request=request)
+        if not self.has_cached_permission(request, 'add'):
+            raise PermissionDenied
+
+        opts = self.model._meta
+        formset_class = self.get_bulk_add_formset(request)
+        form_kwargs = {'defer_unique_checks': True}
+        csv_text = request.POST.get('csv', '').strip() if request.method == 'POST' else ''
+        csv_error = None
+
+        if request.method == 'POST':
+            data = request.POST
+            if csv_text:
+                try:
+                    data = self.get_bulk_add_csv_data(formset_class, csv_text)
+                except ValidationError as e:
+                    csv_error = e.messages[0]
+
+            formset = formset_class(data, form_kwargs=form_kwargs)
+            if csv_error is None and formset.is_valid():
+                forms = [form for form in formset.forms if form.has_changed()]
+                self.validate_bulk_unique(forms)
+                if not any(form.errors for form in forms):
+                    objects = self.save_bulk_add(request, forms)
+                    self.message_user(request, _('Added %(count)d %(items)s.') % {
+                        'count': len(objects),
+                        'items': model_ngettext(opts, len(objects)),
+                    }, messages.SUCCESS)
+
+                    post_url = self.reverse_url('changelist', *self.get_base_url_args(request))
+                    post_url = self.add_preserved_filters(
+                        {'preserved_filters': self.get_preserved_filters(request), 'opts': opts}, post_url, viewname='changelist'
+                    )
+                    return HttpResponseRedirect(post_url)
+
+            if csv_error is None:
+                # The rows are in the formset now, they are corrected there rather than in the CSV.
+                csv_text = ''
+        else:
+            formset = formset_class(form_kwargs=form_kwargs)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('Add multiple %s') % opts.verbose_name_plural,
+            'opts': opts,
+            'formset': formset,
+            'media': self.media + formset.media,
+            'csv': csv_text,
+            'csv_error': csv_error,
+            'csv_columns': list(formset_class.form.base_fields),
+            'preserved_filters': self.get_preserved_filters(request),
+        }
+        context = self.context_add_parent_data(request, context)
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, self.bulk_add_template or [
+            'admin/%s/%s/subadmin_bulk_add.html' % (opts.app_label, opts.model_name),
+            'admin/%s/subadmin_bulk_add.html' % opts.app_label,
+            'subadmin/bulk_add.html',
+        ], context)
+
+    def autocomplete_view(self, request, *args, **kwargs):
+        request.subadmin = self.get_subadmin_helper(args, request=request)
+        return SubAdminAutocompleteJsonView.as_view(admin_site=self.admin_site, sub_admin=self)(request)
+
+    def get_related_subadmin(self, request, model):
+        """
+        Find the subadmin of model among this subadmin and the children of its parents. Return it with the URL
+        args of its changelist under the current parents, or None.
+        """
+        helper = request.subadmin
+        url_args = helper.base_url_args[:len(helper.parents)]
+        if model is self.model:
+            return self, url_args
+
+        for i, parent in enumerate(helper.parents):
+            for sub_admin in parent['admin'].subadmin_instances:
+                if sub_admin.model is model:
+                    return sub_admin, url_args[:len(url_args) - i]
+
+        return None
+
+    @contextmanager
+    def related_subadmin_helper(self, request, sub_admin, url_args):
+        """
+        Make request.subadmin the helper of sub_admin's changelist under url_args inside the block, so its
+        get_queryset() and get_search_results() see their own parents. The shared parents come from the
+        request cache.
+        """
+        helper = request.subadmin
+        if sub_admin is self:
+            yield helper
+            return
+
+        request.subadmin = sub_admin.get_subadmin_helper(helper.view_args[:len(url_args)], request=request)
+        try:
+            yield request.subadmin
+        finally:
+            request.subadmin = helper
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        self.scope_related_formfield(db_field, request, kwargs)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        self.scope_related_formfield(db_field, request, kwargs, multiple=True)
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    def scope_related_formfield(self, db_field, request, kwargs, multiple=False):
+        autocomplete = db_field.name in self.subadmin_autocomplete_fields
+        raw_id = not multiple and db_field.name in self.raw_id_fields
+        if not (autocomplete or raw_id) or not hasattr(request, 'subadmin'):
+            return
+
+        related = self.get_related_subadmin(request, db_field.remote_field.model)
+        if related is None:
+            return
+        sub_admin, url_args = related
+        db = kwargs.get('using')
+
+        if 'widget' not in kwargs:
+            if autocomplete:
+                widget_class = SubAdminAutocompleteSelectMultiple if multiple else SubAdminAutocompleteSelect
+                kwargs['widget'] = widget_class(db_field, self.admin_site, url=request.subadmin.get_url('autocomplete'), using=db)
+            else:
+                kwargs['widget'] = SubAdminForeignKeyRawIdWidget(
+                    db_field.remote_field, self.admin_site, url=sub_admin.reverse_url('changelist', *url_args), using=db
+                )
+
+        if 'queryset' not in kwargs:
+            with self.related_subadmin_helper(request, sub_admin, url_args):
+                kwargs['queryset'] = sub_admin.get_queryset(request).using(db)
+
+    def get_bulk_add_formset(self, request):
+        return forms.formset_factory(
+            self.get_form(request), extra=self.bulk_add_extra, max_num=self.bulk_add_max_rows, validate_max=True
+        )
+
+    def get_bulk_add_csv_data(self, formset_class, csv_text):
+        reader = csv.reader(io.StringIO(csv_text))
+        columns = [column.strip() for column in next(reader)]
+        unknown = [column for column in columns if column not in formset_class.form.base_fields]
+        if unknown:
+            raise ValidationError(_('Unknown CSV columns: %s.') % ', '.join(unknown))
+
+        prefix = formset_class.get_default_prefix()
+        rows = [row for row in reader if any(value.strip() for value in row)]
+        data = {
+            '%s-TOTAL_FORMS' % prefix: len(rows),
+            '%s-INITIAL_FORMS' % prefix: 0,
+        }
+        for i, row in enumerate(rows):
+            if len(row) != len(columns):
+                raise ValidationError(_('CSV row %(row)d has %(count)d values instead of %(expected)d.') % {
+                    'row': i + 1, 'count': len(row), 'expected': len(columns),
+                })
+            data.update(('%s-%d-%s' % (prefix, i, column), value.strip()) for column, value in zip(columns, row))
+
+        return data
+
+    def validate_bulk_unique(self, forms):
+        """
+        Run the unique checks forms deferred with one query per unique field or unique_together set
+        (per batch), and report values that repeat between forms too.
+        """
+        if not forms:
+            return
+
+        unique_checks, date_checks = forms[0].instance._get_unique_checks(
+            exclude=forms[0]._get_subadmin_validation_exclusions()
+        )
+        for model_class, unique_check in unique_checks:
+            fields = [model_class._meta.get_field(name) for name in unique_check]
+            values = OrderedDict()
+
+            for form in forms:
+                key = tuple(getattr(form.instance, field.attname) for field in fields)
+                if any(value is None for value in key):
+                    continue
+                if key in values:
+                    self.add_bulk_unique_error(form, model_class, unique_check)
+                else:
+                    values[key] = form
+
+            keys = list(values)
+            for i in range(0, len(keys), self.bulk_add_batch_size):
+                batch = keys[i:i + self.bulk_add_batch_size]
+                condition = Q()
+                for key in batch:
+                    condition |= Q(**{field.attname: value for field, value in zip(fields, key)})
+
+                for key in model_class._default_manager.filter(condition).values_list(*[field.attname for field in fields]):
+                    if key in values:
+                        self.add_bulk_unique_error(values[key], model_class, unique_check)
+
+        if date_checks:
+            for form in forms:
+                errors = form.instance._perform_date_checks(date_checks)
+                if errors:
+                    form._update_errors(ValidationError(errors))
+
+    def add_bulk_unique_error(self, form, model_class, unique_check):
+        field = unique_check[0] if len(unique_check) == 1 and unique_check[0] in form.fields else NON_FIELD_ERRORS
+        form._update_errors(ValidationError({field: [form.instance.unique_error_message(model_class, unique_check)]}))
+
+    def save_bulk_add(self, request, forms):
+        objects = [form.instance for form in forms]
+        using = router.db_for_write(self.model)
+
+        with transaction.atomic(using=using):
+            if self.can_bulk_create(forms, using):
+                self.model._default_manager.bulk_create(objects, batch_size=self.bulk_add_batch_size)
+            else:
+                for form in forms:
+                    form.save()
+
+            self.log_bulk_addition(request, objects)
+
+        self.invalidate_parent_changelist(request)
+        return objects
+
+    def can_bulk_create(self, forms, using):
+        """
+        Return whether the objects of forms can be inserted with bulk_create(). It doesn't support multi-table
+        inheritance, and without the primary keys of the new rows neither M2M data nor log entries can be saved.
+        """
+        if self.model._meta.parents or not connections[using].features.can_return_rows_from_bulk_insert:
+            return False
+
+        m2m_fields = [field.name for field in self.model._meta.many_to_many]
+        return not any(name in form.fields for form in forms[:1] for name in m2m_fields)
+
+    def log_bulk_addition(self, request, objects):
+        from django.contrib.admin.models import ADDITION, LogEntry
+
+        if not objects:
+            return
+
+        if hasattr(LogEntry.objects, 'log_actions'):
+            LogEntry.objects.log_actions(request.user.pk, objects, ADDITION, change_message=[{'added': {}}])
+        else:
+            for obj in objects:
+                self.log_addition(request, obj, [{'added': {}}])
+
     def get_changelist(self, request, **kwargs):
         return SubAdminChangeList
 
+    def get_keyset_result_count(self, request, queryset):
+        if self.keyset_count_limit is None:
+            return queryset.count(), False
+
+        count = queryset.order_by()[:self.keyset_count_limit + 1].count()
+        return min(count, self.keyset_count_limit), count > self.keyset_count_limit
+
+    def get_view_urls(self):
+        view_urls = [
+            ('', self.changelist_view, 'changelist'),
+            ('add/', self.add_view, 'add'),
+        ]
+        if self.export_formats:
+            view_urls.append(('export/', self.export_view, 'export'))
+        if self.bulk_add:
+            view_urls.append(('bulk-add/', self.bulk_add_view, 'bulk_add'))
+        if self.subadmin_autocomplete_fields:
+            view_urls.append(('autocomplete/', self.autocomplete_view, 'autocomplete'))
+        return view_urls
+
+    def get_object_view_urls(self):
+        return [
+            ('history/', self.history_view, 'history'),
+            ('delete/', self.delete_view, 'delete'),
+            ('change/', self.change_view, 'change'),
+        ]
+
     def get_urls(self):
-        def wrap(view):
+        def wrap(view, object_view=False):
+            if self.instrumentation:
+                view = self.instrument_view(view)
+            if self.async_views:
+                return update_wrapper(self.wrap_async_view(self.admin_site.admin_view(view), object_view), view)
+
             def wrapper(*args, **kwargs):
                 return self.admin_site.admin_view(view)(*args, **kwargs)
             return update_wrapper(wrapper, view)
 
-        base_viewname = self.get_base_viewname()
+        base_viewname = self.base_viewname
 
         urlpatterns = [
             path('' , include(self.get_subadmin_urls())),
-            path('', wrap(self.changelist_view), name='%s_changelist' % base_viewname),
-            path('add/', wrap(self.add_view), name='%s_add' % base_viewname),
-            re_path(r'^(.+)/history/$', wrap(self.history_view), name='%s_history' % base_viewname),
-            re_path(r'^(.+)/delete/$', wrap(self.delete_view), name='%s_delete' % base_viewname),
-            re_path(r'^(.+)/change/$', wrap(self.change_view), name='%s_change' % base_viewname),
+        ]
+        urlpatterns += [
+            path(route, wrap(view), name='%s_%s' % (base_viewname, name)) for route, view, name in self.get_view_urls()
+        ]
+        urlpatterns += [
+            re_path(r'^(.+)/%s$' % route, wrap(view, object_view=True), name='%s_%s' % (base_viewname, name))
+            for route, view, name in self.get_object_view_urls()
+        ]
+
+        return urlpatterns
+
+    def get_flat_urls(self, route):
+        def wrap(view, object_view=False):
+            if self.instrumentation:
+                view = self.instrument_view(view)
+            admin_view = self.admin_site.admin_view(view)
+            if self.async_views:
+                admin_view = self.wrap_async_view(admin_view, object_view)
+
+                async def async_wrapper(request, **kwargs):
+                    return await admin_view(request, *[str(value) for value in kwargs.values()])
+                return update_wrapper(async_wrapper, view)
+
+            def wrapper(request, **kwargs):
+                return admin_view(request, *[str(value) for value in kwargs.values()])
+            return update_wrapper(wrapper, view)
+
+        base_viewname = self.base_viewname
+
+        urlpatterns = [
+            path('%s%s' % (route, view_route), wrap(view), name='%s_%s' % (base_viewname, name))
+            for view_route, view, name in self.get_view_urls()
+        ]
+        urlpatterns += [
+            path('%s<str:object_id>/%s' % (route, view_route), wrap(view, object_view=True), name='%s_%s' % (base_viewname, name))
+            for view_route, view, name in self.get_object_view_urls()
         ]
 
-        urlpatterns =  urlpatterns
         return urlpatterns
 
+    def get_search_backend(self):
+        return self._search_backend
+
+    def get_search_results(self, request, queryset, search_term):
+        backend = self.get_search_backend()
+        if backend is not None and search_term:
+            results = backend.get_search_results(request, queryset, search_term)
+            if results is not None:
+                return results
+        return super().get_search_results(request, queryset, search_term)
+
     def get_queryset(self, request):
-        lookup_kwargs = request.subadmin.lookup_kwargs
+        lookup_kwargs = self.get_parent_lookup_kwargs(request)
         return super().get_queryset(request).filter(**lookup_kwargs)
 
+    def get_list_prefetch_related(self, request):
+        """
+        Return the lookups prefetched for the rows of the changelist: list_prefetch_related, followed by the
+        inherited_prefetch_related of every ancestor admin, prefixed with the path to that ancestor.
+        """
+        lookups = list(self.list_prefetch_related)
+        modeladmin = self
+        path = None
+
+        for parent in request.subadmin.parents:
+            path = modeladmin.fk_name if path is None else '%s__%s' % (path, modeladmin.fk_name)
+            modeladmin = parent['admin']
+            for lookup in modeladmin.inherited_prefetch_related:
+                if isinstance(lookup, Prefetch):
+                    lookup = copy.copy(lookup)
+                    lookup.add_prefix(path)
+                else:
+                    lookup = '%s__%s' % (path, lookup)
+                lookups.append(lookup)
+        return lookups
+
+    def attach_parent_instances(self, request, objs):
+        """
+        Set the foreign key caches of objs, and of the ancestors along the tree, to the parent instances
+        request.subadmin already loaded, so lookups like `parent__name` don't query them again.
+        """
+        modeladmin = self
+        for parent in request.subadmin.parents:
+            field = modeladmin.model._meta.get_field(modeladmin.fk_name)
+            if not (field.concrete and (field.many_to_one or field.one_to_one)):
+                break
+
+            obj = parent['object']
+            value = getattr(obj, field.target_field.attname)
+            for child in objs:
+                if getattr(child, field.attname) == value and not field.is_cached(child):
+                    field.set_cached_value(child, obj)
+
+            objs = [obj]
+            modeladmin = parent['admin']
+
+    def prepare_results(self, request, objs):
+        with self.instrument(request, 'prefetch'):
+            self.attach_parent_instances(request, objs)
+            lookups = self.get_list_prefetch_related(request)
+            if lookups:
+                prefetch_related_objects(objs, *lookups)
+
+    def get_parent_lookup_kwargs(self, request):
+        if self.direct_parent_lookup and request.subadmin.tree_verified:
+            return request.subadmin.parent_lookup_kwargs
+        return request.subadmin.lookup_kwargs
+
     def get_exclude(self, request, obj=None):
         exclude = super().get_exclude(request, obj)
         exclude = list(exclude) if exclude else []
         exclude.extend(request.subadmin.related_instances.keys())
         return list(set(exclude))
 
+    def get_subadmin_form_class(self, form):
+        if issubclass(form, SubAdminFormMixin):
+            return form
+
+        if form not in self._subadmin_form_classes:
+            self._subadmin_form_classes[form] = type(form)(form.__name__, (SubAdminFormMixin, form), {})
+        return self._subadmin_form_classes[form]
+
     def prep_subadmin_form(self, request, form):
-        attrs = {'_related_instances': request.subadmin.related_instances}
-        return type(form)(form.__name__, (SubAdminFormMixin, form), attrs)
+        """
+        Return a subclass of form that passes the parent instances of request to the related_instances
+        argument of every form it instantiates. form itself is never modified, so shared classes like
+        self.form can be passed in safely.
+        """
+        if not issubclass(form, SubAdminFormMixin):
+            form = type(form)(form.__name__, (SubAdminFormMixin, form), {})
+        related_instances = request.subadmin.related_instances
+
+        def __init__(self, *args, **kwargs):
+            kwargs.setdefault('related_instances', related_instances)
+            super(prepared_form, self).__init__(*args, **kwargs)
+
+        # Only __init__ differs, so the metaclass is skipped instead of building the form's fields again; they
+        # are inherited from form.
+        prepared_form = type.__new__(type(form), form.__name__, (form,), {
+            '__init__': __init__, '__module__': form.__module__, '__qualname__': form.__qualname__,
+        })
+        return prepared_form
+
+    def bind_subadmin_form(self, request, form):
+        """
+        Make the parent instances of request the related_instances default of form, a class built for this
+        request by Django's form factory, without subclassing it again. The factory class can't be cached and
+        reused instead, because its fields hold request-specific querysets and widgets. Classes that may be
+        shared between requests are handed to prep_subadmin_form().
+        """
+        if not issubclass(form, SubAdminFormMixin) or form is self.form or form in self._subadmin_form_classes.values():
+            return self.prep_subadmin_form(request, form)
+        form._related_instances = request.subadmin.related_instances
+        return form
 
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
-        return self.prep_subadmin_form(request, form)
+        return self.bind_subadmin_form(request, form)
 
     def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', self.get_subadmin_form_class(forms.ModelForm))
         form = super().get_changelist_form(request, **kwargs)
-        return self.prep_subadmin_form(request, form)
+        return self.bind_subadmin_form(request, form)
 
     def get_base_viewname(self):
-        if hasattr(self.parent_admin, 'get_base_viewname'):
-            base_viewname = self.parent_admin.get_base_viewname()
+        if hasattr(self.parent_admin, 'base_viewname'):
+            base_viewname = self.parent_admin.base_viewname
         else:
             base_viewname = '%s_%s' % (self.parent_model._meta.app_label, self.parent_model._meta.model_name)
 
         return '%s_%s' % (base_viewname, self.model._meta.model_name)
 
-    def reverse_url(self, viewname, *args, **kwargs):
-        return reverse('admin:%s_%s' % (self.get_base_viewname(), viewname), args=args, kwargs=kwargs,
-                       current_app=self.admin_site.name)
+    def get_viewname(self, viewname):
+        return 'admin:%s_%s' % (self.base_viewname, viewname)
 
     def get_base_url_args(self, request):
         if hasattr(request, 'subadmin'):
@@ -269,13 +1919,214 @@ class SubAdminMixin(SubAdminBase):
         return context
 
     def get_parent_instance(self, parent_id):
-        return get_object_or_404(self.parent_model, pk=unquote(parent_id))
+        obj = self.get_cached_parent_instance(unquote(parent_id))
+        if obj is None:
+            obj = get_object_or_404(self.parent_model, pk=unquote(parent_id))
+            self.cache_parent_instance(obj)
+        return obj
+
+    async def aget_parent_instance(self, parent_id):
+        if type(self).get_parent_instance is not SubAdminMixin.get_parent_instance:
+            return await sync_to_async(self.get_parent_instance)(parent_id)
+
+        obj = await self.aget_cached_parent_instance(unquote(parent_id))
+        if obj is None:
+            try:
+                obj = await self.parent_model._default_manager.aget(pk=unquote(parent_id))
+            except self.parent_model.DoesNotExist:
+                raise Http404
+            await self.acache_parent_instance(obj)
+        return obj
+
+    def get_parent_cache(self):
+        if self.parent_cache is None:
+            return None
+        return caches[self.parent_cache]
+
+    def get_breadcrumbs_cache(self):
+        if self.breadcrumbs_cache is None:
+            return None
+        return caches[self.breadcrumbs_cache]
+
+    def get_changelist_cache(self):
+        if self.changelist_cache is None:
+            return None
+        return caches[self.changelist_cache]
+
+    def get_changelist_version_key(self, model, value, scope=''):
+        return 'subadmin:changelist:version:%s:%s:%s' % (
+            model._meta.concrete_model._meta.label_lower, scope, hashlib.md5(str(value).encode()).hexdigest()
+        )
+
+    def get_changelist_versions(self, request):
+        """
+        Return the versions of the children of the parent and of every ancestor, the cached result tables of
+        a changelist are only valid for them.
+        """
+        cache = self.get_changelist_cache()
+        parent_field = self.model._meta.get_field(self.fk_name)
+        keys = [self.get_changelist_version_key(
+            self.model, getattr(request.subadmin.parent_instance, parent_field.target_field.attname), self.fk_name
+        )]
+        keys += [self.get_changelist_version_key(type(parent['object']), parent['object'].pk) for parent in request.subadmin.parents]
+
+        versions = cache.get_many(keys)
+        missing = [key for key in keys if key not in versions]
+        if missing:
+            for key in missing:
+                cache.add(key, uuid.uuid4().hex, None)
+            versions.update(cache.get_many(missing))
+        return [versions.get(key) for key in keys]
+
+    def get_changelist_cache_permissions(self, request):
+        return (
+            [self.has_cached_permission(request, perm) for perm in ('view', 'change', 'delete', 'add')],
+            sorted(self.get_actions(request)),
+        )
+
+    def get_changelist_cache_key(self, request, cl):
+        """
+        Return the key the rendered result table of cl is cached under, or None when it shouldn't be cached.
+        """
+        if self.changelist_cache is None or request.method != 'GET' or cl.list_editable:
+            return None
+
+        key = repr((
+            self.admin_site.name, get_script_prefix(), get_urlconf(), request.path, request.subadmin.view_args,
+            sorted(request.GET.lists()),
+            get_language(), get_current_timezone_name(), self.get_changelist_cache_permissions(request),
+            request.user.pk if self.changelist_cache_per_user else None, self.get_changelist_versions(request),
+        ))
+        return 'subadmin:changelist:%s:%s' % (self.base_viewname, hashlib.md5(key.encode()).hexdigest())
+
+    def bump_changelist_version(self, value):
+        self.get_changelist_cache().set(self.get_changelist_version_key(self.model, value, self.fk_name), uuid.uuid4().hex, None)
+
+    def invalidate_changelist_cache(self, sender, instance, **kwargs):
+        parent_field = self.model._meta.get_field(self.fk_name)
+        value = getattr(instance, parent_field.attname)
+        if value is not None:
+            self.bump_changelist_version(value)
+
+    def invalidate_changelist_previous_parent(self, sender, instance, using=None, update_fields=None, **kwargs):
+        """
+        Before a child is saved, bump the version of the parent it is moved away from. That parent is read from
+        the database, as the instance only holds the new one.
+        """
+        parent_field = self.model._meta.get_field(self.fk_name)
+        if instance._state.adding or instance.pk is None:
+            return
+        if update_fields is not None and not {parent_field.name, parent_field.attname} & set(update_fields):
+            return
+
+        previous = sender._base_manager.using(using).filter(pk=instance.pk).values_list(parent_field.attname, flat=True).first()
+        if previous is not None and previous != getattr(instance, parent_field.attname):
+            self.bump_changelist_version(previous)
+
+    def invalidate_parent_changelist(self, request):
+        """
+        Bump the version of the current parent's children after changes that send no signals (bulk_create(),
+        raw deletes).
+        """
+        if self.changelist_cache is None:
+            return
+
+        parent_field = self.model._meta.get_field(self.fk_name)
+        self.bump_changelist_version(getattr(request.subadmin.parent_instance, parent_field.target_field.attname))
+
+    def invalidate_changelist_parent_cache(self, sender, instance, **kwargs):
+        self.get_changelist_cache().set(self.get_changelist_version_key(sender, instance.pk), uuid.uuid4().hex, None)
+
+    def get_parent_cache_key(self, pk):
+        return 'subadmin:parent:%s:%s' % (self.parent_model._meta.label_lower, hashlib.md5(str(pk).encode()).hexdigest())
+
+    def get_cached_parent_instance(self, pk):
+        cache = self.get_parent_cache()
+        if cache is None:
+            return None
+        return cache.get(self.get_parent_cache_key(pk))
+
+    async def aget_cached_parent_instance(self, pk):
+        cache = self.get_parent_cache()
+        if cache is None:
+            return None
+        return await cache.aget(self.get_parent_cache_key(pk))
+
+    def cache_parent_instance(self, obj):
+        cache = self.get_parent_cache()
+        if cache is None:
+            return
+        cache.set(self.get_parent_cache_key(obj.pk), self.get_parent_cache_value(obj), self.parent_cache_timeout)
+
+    async def acache_parent_instance(self, obj):
+        cache = self.get_parent_cache()
+        if cache is None:
+            return
+        await cache.aset(self.get_parent_cache_key(obj.pk), self.get_parent_cache_value(obj), self.parent_cache_timeout)
+
+    def get_parent_cache_value(self, obj):
+        # Ancestors are cached and invalidated separately, don't pickle them along with obj.
+        obj = copy.copy(obj)
+        obj._state = copy.copy(obj._state)
+        obj._state.fields_cache = {}
+        return obj
+
+    def invalidate_parent_cache(self, sender, instance, **kwargs):
+        self.get_parent_cache().delete(self.get_parent_cache_key(instance.pk))
+
+    @classmethod
+    def get_signal_senders(cls, parent_models):
+        """
+        Return the (signal, model) pairs instances of cls receive in model_changed(), parent_models being the
+        models of their ancestors, nearest first. It is asked of the class, so the receivers of lazy
+        subadmins can be connected before they are instantiated.
+        """
+        models = set()
+        if cls.parent_cache is not None:
+            models.add(parent_models[0])
+        if cls.changelist_cache is not None:
+            models.add(cls.model)
+            models.update(parent_models)
+
+        models |= {model._meta.concrete_model for model in models}
+        senders = [(signal, model) for model in models for signal in (post_save, post_delete)]
+        if cls.changelist_cache is not None:
+            senders += [(pre_save, model) for model in {cls.model, cls.model._meta.concrete_model}]
+
+        if cls.search_backend is not None:
+            senders += [sender for sender in cls.search_backend.get_signal_senders(cls.model) if sender not in senders]
+        return senders
+
+    def connect_model_signals(self):
+        for signal, model in self.get_signal_senders(self.get_model_chain()[1:]):
+            signal.connect(self.model_changed, sender=model)
+
+    def model_changed(self, sender, instance, signal, **kwargs):
+        model = sender._meta.concrete_model
+
+        if signal is pre_save:
+            if self.changelist_cache is not None and model is self.model._meta.concrete_model:
+                self.invalidate_changelist_previous_parent(sender, instance, **kwargs)
+            return
+
+        if self.parent_cache is not None and model is self.parent_model._meta.concrete_model:
+            self.invalidate_parent_cache(sender, instance, **kwargs)
+
+        if self.changelist_cache is not None:
+            if model is self.model._meta.concrete_model:
+                self.invalidate_changelist_cache(sender, instance, **kwargs)
+            if model in [parent_model._meta.concrete_model for parent_model in self.get_model_chain()[1:]]:
+                self.invalidate_changelist_parent_cache(sender, instance, **kwargs)
+
+        backend = self.get_search_backend()
+        if backend is not None and model is self.model._meta.concrete_model:
+            backend.model_changed(sender, instance, signal=signal, **kwargs)
 
     def get_preserved_filters(self, request):
         match = request.resolver_match
         if self.preserve_filters and match:
             current_url = '%s:%s' % (match.app_name, match.url_name)
-            changelist_url = 'admin:%s_changelist' % self.get_base_viewname()
+            changelist_url = self.get_viewname('changelist')
             if current_url == changelist_url:
                 preserved_filters = request.GET.urlencode()
             else:
@@ -285,75 +2136,86 @@ class SubAdminMixin(SubAdminBase):
                 return urlencode({'_changelist_filters': preserved_filters})
         return ''
 
-    def add_preserved_filters(self, context, url, popup=False, to_field=None):
-        opts = context.get('opts')
-        preserved_filters = context.get('preserved_filters')
+    def add_preserved_filters(self, context, url, popup=False, to_field=None, viewname=None):
+        """
+        Add the preserved filters of context to url. viewname is the view url points to ('changelist',
+        'change', ...), url is only resolved to find it out when it is not passed.
+        """
+        preserved_filters = context.get('preserved_filters') if context.get('opts') else None
+        if not (preserved_filters or popup or to_field):
+            return url
 
-        parsed_url = list(urlparse(url))
-        parsed_qs = dict(parse_qsl(parsed_url[4]))
         merged_qs = dict()
 
-        if opts and preserved_filters:
+        if preserved_filters:
             preserved_filters = dict(parse_qsl(preserved_filters))
-
-            match_url = '/%s' % url.partition(get_script_prefix())[2]
-            try:
-                match = resolve(match_url)
-            except Resolver404:
-                pass
-            else:
-                current_url = '%s:%s' % (match.app_name, match.url_name)
-                changelist_url = 'admin:%s_changelist' % self.get_base_viewname()
-                if changelist_url == current_url and '_changelist_filters' in preserved_filters:
+            if '_changelist_filters' in preserved_filters:
+                if viewname is None:
+                    viewname = self.get_url_viewname(url)
+                if viewname in ('changelist', self.get_viewname('changelist')):
                     preserved_filters = dict(parse_qsl(preserved_filters['_changelist_filters']))
 
             merged_qs.update(preserved_filters)
 
         if popup:
-            from django.contrib.admin.options import IS_POPUP_VAR
             merged_qs[IS_POPUP_VAR] = 1
         if to_field:
-            from django.contrib.admin.options import TO_FIELD_VAR
             merged_qs[TO_FIELD_VAR] = to_field
 
-        merged_qs.update(parsed_qs)
+        parsed_url = list(urlparse(url))
+        merged_qs.update(parse_qsl(parsed_url[4]))
 
         parsed_url[4] = urlencode(merged_qs)
         return urlunparse(parsed_url)
 
+    def get_url_viewname(self, url):
+        try:
+            match = resolve('/%s' % url.partition(get_script_prefix())[2])
+        except Resolver404:
+            return None
+        return '%s:%s' % (match.app_name, match.url_name)
+
     @csrf_protect_m
     def changelist_view(self, request, *args, **kwargs):
         extra_context = kwargs.get('extra_context')
-        request.subadmin = SubAdminHelper(self, args)
+        request.subadmin = self.get_subadmin_helper(args, request=request)
         extra_context = self.context_add_parent_data(request, extra_context)
+        extra_context['export_formats'] = self.export_formats
+        extra_context['bulk_add'] = self.bulk_add
         return super().changelist_view(request, extra_context)
 
     def add_view(self, request, *args, **kwargs):
         form_url, extra_context = kwargs.get('form_url', ''), kwargs.get('extra_context')
-        request.subadmin = SubAdminHelper(self, args)
+        request.subadmin = self.get_subadmin_helper(args, request=request)
         extra_context = self.context_add_parent_data(request, extra_context)
         return super().add_view(request, form_url, extra_context)
 
     def change_view(self, request, *args, **kwargs):
         form_url, extra_context = kwargs.get('form_url', ''), kwargs.get('extra_context')
         object_id = args[-1]
-        request.subadmin = SubAdminHelper(self, args, object_id=object_id)
+        request.subadmin = self.get_subadmin_helper(args, object_id=object_id, request=request)
         extra_context = self.context_add_parent_data(request, extra_context)
         return super().change_view(request, object_id, form_url, extra_context)
 
     @csrf_protect_m
-    @transaction.atomic
     def delete_view(self, request, *args, **kwargs):
         extra_context = kwargs.get('extra_context')
         object_id = args[-1]
-        request.subadmin = SubAdminHelper(self, args, object_id=object_id)
+        request.subadmin = self.get_subadmin_helper(args, object_id=object_id, request=request)
         extra_context = self.context_add_parent_data(request, extra_context)
-        return super().delete_view(request, object_id, extra_context)
+
+        if self.delete_batch_size:
+            # delete_model() deletes the cascade in batches with a transaction each, which an enclosing
+            # transaction (this view's or Django's) would turn back into a single one holding every lock.
+            return self._delete_view(request, object_id, extra_context)
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            return super().delete_view(request, object_id, extra_context)
 
     def history_view(self, request, *args, **kwargs):
         extra_context = kwargs.get('extra_context')
         object_id = args[-1]
-        request.subadmin = SubAdminHelper(self, args, object_id=object_id)
+        request.subadmin = self.get_subadmin_helper(args, object_id=object_id, request=request)
         extra_context = self.context_add_parent_data(request, extra_context)
         return super().history_view(request, object_id, extra_context)
 
@@ -368,7 +2230,7 @@ class SubAdminMixin(SubAdminBase):
 
         obj_url = self.reverse_url('change', *url_args + [quote(pk_value)])
 
-        if self.has_change_permission(request, obj):
+        if self.has_cached_permission(request, 'change', obj):
             obj_repr = format_html('<a href="{}">{}</a>', quote(obj_url), obj)
         else:
             obj_repr = str(obj)
@@ -399,18 +2261,19 @@ class SubAdminMixin(SubAdminBase):
 
         elif "_continue" in request.POST or (
                 "_saveasnew" in request.POST and self.save_as_continue and
-                self.has_change_permission(request, obj)
+                self.has_cached_permission(request, 'change', obj)
         ):
             msg = format_html(
                 _('The {name} "{obj}" was added successfully. You may edit it again below.'),
                 **msg_dict
             )
             self.message_user(request, msg, messages.SUCCESS)
+            continue_viewname = None
             if post_url_continue is None:
-                post_url_continue = obj_url
+                post_url_continue, continue_viewname = obj_url, 'change'
             post_url_continue = self.add_preserved_filters(
                 {'preserved_filters': preserved_filters, 'opts': opts},
-                post_url_continue
+                post_url_continue, viewname=continue_viewname
             )
             return HttpResponseRedirect(post_url_continue)
 
@@ -421,7 +2284,7 @@ class SubAdminMixin(SubAdminBase):
             )
             self.message_user(request, msg, messages.SUCCESS)
             redirect_url = request.path
-            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url)
+            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url, viewname='add')
             return HttpResponseRedirect(redirect_url)
 
         else:
@@ -434,9 +2297,10 @@ class SubAdminMixin(SubAdminBase):
 
     def response_change(self, request, obj):
         if IS_POPUP_VAR in request.POST:
+            opts = obj._meta
             to_field = request.POST.get(TO_FIELD_VAR)
             attr = str(to_field) if to_field else obj._meta.pk.attname
-            value = request.resolver_match.args[0]
+            value = unquote(request.subadmin.object_id)
             new_value = obj.serializable_value(attr)
             popup_response_data = json.dumps({
                 'action': 'change',
@@ -467,7 +2331,7 @@ class SubAdminMixin(SubAdminBase):
             )
             self.message_user(request, msg, messages.SUCCESS)
             redirect_url = request.path
-            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url)
+            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url, viewname='change')
             return HttpResponseRedirect(redirect_url)
 
         elif "_saveasnew" in request.POST:
@@ -477,7 +2341,7 @@ class SubAdminMixin(SubAdminBase):
             )
             self.message_user(request, msg, messages.SUCCESS)
             redirect_url = self.reverse_url('change', *self.get_base_url_args(request))
-            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url)
+            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url, viewname='change')
             return HttpResponseRedirect(redirect_url)
 
         elif "_addanother" in request.POST:
@@ -487,7 +2351,7 @@ class SubAdminMixin(SubAdminBase):
             )
             self.message_user(request, msg, messages.SUCCESS)
             redirect_url = self.reverse_url('add', *self.get_base_url_args(request)[:-1])
-            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url)
+            redirect_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, redirect_url, viewname='add')
             return HttpResponseRedirect(redirect_url)
 
         else:
@@ -500,10 +2364,10 @@ class SubAdminMixin(SubAdminBase):
 
     def response_post_save_add(self, request, obj):
         opts = self.model._meta
-        if self.has_change_permission(request, None):
+        if self.has_cached_permission(request, 'change'):
             post_url = self.reverse_url('changelist', *self.get_base_url_args(request))
             preserved_filters = self.get_preserved_filters(request)
-            post_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, post_url)
+            post_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, post_url, viewname='changelist')
         else:
             post_url = reverse('admin:index', current_app=self.admin_site.name)
         return HttpResponseRedirect(post_url)
@@ -511,10 +2375,10 @@ class SubAdminMixin(SubAdminBase):
     def response_post_save_change(self, request, obj):
         opts = self.model._meta
 
-        if self.has_change_permission(request, None):
+        if self.has_cached_permission(request, 'change'):
             post_url = self.reverse_url('changelist', *self.get_base_url_args(request)[:-1])
             preserved_filters = self.get_preserved_filters(request)
-            post_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, post_url)
+            post_url = self.add_preserved_filters({'preserved_filters': preserved_filters, 'opts': opts}, post_url, viewname='changelist')
         else:
             post_url = reverse('admin:index', current_app=self.admin_site.name)
         return HttpResponseRedirect(post_url)
@@ -535,20 +2399,25 @@ class SubAdminMixin(SubAdminBase):
                 'popup_response_data': popup_response_data,
             })
 
-        self.message_user(
-            request,
-            _('The %(name)s "%(obj)s" was deleted successfully.') % {
+        if request.subadmin.batched_delete and request.subadmin.batched_delete[1]:
+            count, batches = request.subadmin.batched_delete
+            message = ngettext(
+                'The %(name)s "%(obj)s" was deleted successfully, along with %(count)d related objects in %(batches)d batch.',
+                'The %(name)s "%(obj)s" was deleted successfully, along with %(count)d related objects in %(batches)d batches.',
+                batches,
+            ) % {'name': str(opts.verbose_name), 'obj': str(obj_display), 'count': count, 'batches': batches}
+        else:
+            message = _('The %(name)s "%(obj)s" was deleted successfully.') % {
                 'name': str(opts.verbose_name),
                 'obj': str(obj_display),
-            },
-            messages.SUCCESS,
-        )
+            }
+        self.message_user(request, message, messages.SUCCESS)
 
-        if self.has_change_permission(request, None):
+        if self.has_cached_permission(request, 'change'):
             post_url = self.reverse_url('changelist', *self.get_base_url_args(request)[:-1])
             preserved_filters = self.get_preserved_filters(request)
             post_url = self.add_preserved_filters(
-                {'preserved_filters': preserved_filters, 'opts': opts}, post_url
+                {'preserved_filters': preserved_filters, 'opts': opts}, post_url, viewname='changelist'
             )
         else:
             post_url = reverse('admin:index', current_app=self.admin_site.name)
@@ -557,17 +2426,23 @@ class SubAdminMixin(SubAdminBase):
 
 class RootSubAdminMixin(SubAdminBase):
     change_form_template = 'subadmin/parent_change_form.html'
+    flat_subadmin_urls = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.subadmin_instances = self.get_subadmin_instances()
+        if not self.lazy_subadmins:
+            self.subadmin_instances = self.load_subadmin_instances()
+        else:
+            self.connect_lazy_subadmin_receivers()
 
     def get_urls(self):
+        if self.flat_subadmin_urls:
+            return self.get_flat_subadmin_urls() + super().get_urls()
         return self.get_subadmin_urls() + super().get_urls()
 
-    def reverse_url(self, viewname, *args, **kwargs):
+    def get_viewname(self, viewname):
         info = self.model._meta.app_label, self.model._meta.model_name, viewname
-        return reverse('admin:%s_%s_%s' % info, args=args, kwargs=kwargs, current_app=self.admin_site.name)
+        return 'admin:%s_%s_%s' % info
 
 
 class SubAdmin(SubAdminMixin, admin.ModelAdmin):
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.core import checks
+
+
+class SubAdminConfig(AppConfig):
+    name = 'subadmin'
+    verbose_name = 'SubAdmin'
+
+    def ready(self):
+        from .checks import check_subadmin_indexes
+        checks.register(check_subadmin_indexes, checks.Tags.admin, checks.Tags.models)
@@ -0,0 +1,53 @@
+from django.contrib.admin.sites import all_sites
+from django.core import checks
+
+
+def iter_subadmins(modeladmin):
+    for subadmin in getattr(modeladmin, 'subadmin_instances', None) or []:
+        yield subadmin
+        yield from iter_subadmins(subadmin)
+
+
+def is_leading_index_field(field, opts):
+    if field.primary_key or field.unique or field.db_index:
+        return True
+
+    field_lists = [index.fields for index in opts.indexes]
+    field_lists += [constraint.fields for constraint in opts.constraints if getattr(constraint, 'fields', None)]
+    field_lists += list(opts.unique_together) + list(getattr(opts, 'index_together', ()))
+
+    return any(fields and fields[0].lstrip('-') in (field.name, field.attname) for fields in field_lists)
+
+
+def check_subadmin_indexes(app_configs=None, **kwargs):
+    from . import SubAdminBase
+
+    errors = []
+    seen = set()
+
+    for site in all_sites:
+        for model, modeladmin in site._registry.items():
+            if not isinstance(modeladmin, SubAdminBase):
+                continue
+
+            for subadmin in iter_subadmins(modeladmin):
+                opts = subadmin.model._meta
+                if app_configs is not None and opts.app_config not in app_configs:
+                    continue
+
+                field = opts.get_field(subadmin.fk_name)
+                if (opts.label, field.name) in seen or not field.concrete:
+                    continue
+                seen.add((opts.label, field.name))
+
+                if not is_leading_index_field(field, opts):
+                    errors.append(checks.Warning(
+                        "'%s.%s' is used by %s to filter by parent, but is not the leading column of any index."
+                        % (opts.label, field.name, type(subadmin).__name__),
+                        hint="Set db_index=True on '%s' or add an index starting with it to %s.Meta.indexes."
+                             % (field.name, opts.object_name),
+                        obj=type(subadmin),
+                        id='subadmin.W001',
+                    ))
+
+    return errors
@@ -0,0 +1,26 @@
+from django.contrib.admin.sites import all_sites
+from django.core.management.base import BaseCommand
+
+from subadmin import SubAdminBase
+from subadmin.checks import iter_subadmins
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search indexes of subadmins with a search_backend.'
+
+    def handle(self, *args, **options):
+        seen = set()
+
+        for site in all_sites:
+            for modeladmin in list(site._registry.values()):
+                if not isinstance(modeladmin, SubAdminBase):
+                    continue
+
+                for subadmin in iter_subadmins(modeladmin):
+                    backend = subadmin.get_search_backend()
+                    if backend is None or backend.get_index_key() in seen:
+                        continue
+                    seen.add(backend.get_index_key())
+
+                    backend.rebuild()
+                    self.stdout.write('Rebuilt %s search index of %s.' % (type(backend).__name__, subadmin.model._meta.label))
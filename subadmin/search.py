@@ -0,0 +1,200 @@
+import hashlib
+
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.utils.functional import cached_property
+from django.utils.text import smart_split, unescape_string_literal
+
+
+class SearchBackend(object):
+    """
+    Base class for SubAdmin.search_backend. A backend is created for every subadmin using it, and returns the
+    search results of the subadmin's changelist (and autocomplete) instead of the icontains lookups of
+    search_fields. Return None from get_search_results() to fall back to them.
+    """
+
+    def __init__(self, sub_admin):
+        self.sub_admin = sub_admin
+        self.model = sub_admin.model
+
+    @classmethod
+    def get_signal_senders(cls, model):
+        """
+        Return the (signal, model) pairs model_changed() is called for. They are connected when the subadmin's
+        tree is loaded, before lazy subadmins are instantiated.
+        """
+        return []
+
+    def model_changed(self, sender, instance, signal, **kwargs):
+        pass
+
+    def get_search_results(self, request, queryset, search_term):
+        raise NotImplementedError
+
+    def get_search_terms(self, search_term):
+        return [
+            unescape_string_literal(bit) if bit[:1] in ('"', "'") and bit[-1:] == bit[:1] else bit
+            for bit in smart_split(search_term)
+        ]
+
+    def get_parent_value(self, request):
+        helper = getattr(request, 'subadmin', None)
+        if helper is None or helper.sub_admin is not self.sub_admin or not helper.parents:
+            return None
+
+        field = self.model._meta.get_field(self.sub_admin.fk_name)
+        return getattr(helper.parent_instance, field.target_field.attname)
+
+    def get_index_key(self):
+        """
+        Return what identifies the index of this backend. Backends with equal keys share one index, which
+        rebuild_subadmin_search rebuilds only once.
+        """
+        return (type(self), self.model)
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """
+    Keeps an SQLite FTS5 table of the subadmin's search_fields, with the parent primary key as an indexed
+    token, so searching under one parent is a single index lookup instead of a scan of the whole table.
+    Every combination of search_fields and parent foreign key gets a table of its own.
+    The table is created and filled by the rebuild_subadmin_search command, and until then Django's search
+    is used. The index is updated from post_save and post_delete signals; bulk operations skip those, run
+    the command after them. Requires an integer primary key.
+    """
+    prefix = '2 3'
+    rebuild_batch_size = 1000
+
+    def __init__(self, sub_admin):
+        super().__init__(sub_admin)
+        self.fields = [name.lstrip('^=@') for name in sub_admin.search_fields]
+        self.tables_found = set()
+
+    @cached_property
+    def table(self):
+        # Not computed in __init__(), fk_name of lazy subadmins is looked up on first use.
+        config = repr((self.sub_admin.fk_name, self.fields))
+        return 'subadmin_fts_%s_%s' % (self.model._meta.db_table, hashlib.md5(config.encode()).hexdigest()[:8])
+
+    def get_index_key(self):
+        return (type(self), self.table)
+
+    @classmethod
+    def get_signal_senders(cls, model):
+        models = {model, model._meta.concrete_model}
+        return [(signal, model) for model in models for signal in (post_save, post_delete)]
+
+    def model_changed(self, sender, instance, signal, **kwargs):
+        if signal is post_delete:
+            self.delete_index(sender, instance)
+        else:
+            self.update_index(sender, instance)
+
+    @property
+    def connection(self):
+        return connections[router.db_for_write(self.model)]
+
+    def is_supported(self, connection):
+        return (
+            connection.vendor == 'sqlite' and self.fields and
+            self.model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField')
+        )
+
+    def get_columns(self):
+        return ['parent'] + ['f%d' % i for i in range(len(self.fields))]
+
+    def has_table(self, connection):
+        # Only found tables are remembered, so one created by rebuild_subadmin_search is picked up later.
+        if connection.alias not in self.tables_found:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table])
+                if cursor.fetchone() is None:
+                    return False
+            self.tables_found.add(connection.alias)
+        return True
+
+    def create_table(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(%s, prefix='%s')" % (
+                connection.ops.quote_name(self.table), ', '.join(self.get_columns()), self.prefix,
+            ))
+
+    def get_parent_token(self, value):
+        return 'p%s' % value
+
+    def get_row(self, obj):
+        parent_field = self.model._meta.get_field(self.sub_admin.fk_name)
+        row = [obj.pk, self.get_parent_token(getattr(obj, parent_field.attname))]
+
+        for name in self.fields:
+            value = obj
+            for part in name.split('__'):
+                value = getattr(value, part, None) if value is not None else None
+            row.append('' if value is None else str(value))
+        return row
+
+    def get_search_results(self, request, queryset, search_term):
+        connection = connections[queryset.db]
+        terms = self.get_search_terms(search_term)
+        if not terms or not self.is_supported(connection) or not self.has_table(connection):
+            return None
+
+        columns = ' '.join(self.get_columns()[1:])
+        match = ['{%s} : "%s"*' % (columns, term.replace('"', '""')) for term in terms]
+        parent_value = self.get_parent_value(request)
+        if parent_value is not None:
+            match.insert(0, 'parent : "%s"' % self.get_parent_token(parent_value))
+
+        table = connection.ops.quote_name(self.table)
+        ids = RawSQL('SELECT rowid FROM %s WHERE %s MATCH %%s' % (table, table), [' AND '.join(match)])
+        return queryset.filter(pk__in=ids), False
+
+    def update_index(self, sender, instance, **kwargs):
+        connection = self.connection
+        if not self.is_supported(connection) or not self.has_table(connection):
+            return
+
+        table = connection.ops.quote_name(self.table)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE rowid = %%s' % table, [instance.pk])
+            cursor.execute('INSERT INTO %s (rowid, %s) VALUES (%s)' % (
+                table, ', '.join(self.get_columns()), ', '.join(['%s'] * (len(self.fields) + 2))
+            ), self.get_row(instance))
+
+    def delete_index(self, sender, instance, **kwargs):
+        connection = self.connection
+        if not self.is_supported(connection) or not self.has_table(connection):
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE rowid = %%s' % connection.ops.quote_name(self.table), [instance.pk])
+
+    def rebuild(self):
+        connection = self.connection
+        if not self.is_supported(connection):
+            return
+        self.create_table(connection)
+
+        table = connection.ops.quote_name(self.table)
+        insert = 'INSERT INTO %s (rowid, %s) VALUES (%s)' % (
+            table, ', '.join(self.get_columns()), ', '.join(['%s'] * (len(self.fields) + 2))
+        )
+        queryset = self.model._default_manager.using(connection.alias).order_by('pk')
+        related = [name.rsplit('__', 1)[0] for name in self.fields if '__' in name]
+        if related:
+            queryset = queryset.select_related(*related)
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % table)
+            batch = []
+            for obj in queryset.iterator(chunk_size=self.rebuild_batch_size):
+                batch.append(self.get_row(obj))
+                if len(batch) >= self.rebuild_batch_size:
+                    cursor.executemany(insert, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(insert, batch)
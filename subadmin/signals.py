@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+
+# Sent when an instrumented phase of a subadmin request ('tree', 'permissions', 'changelist', 'view', ...)
+# finishes. Arguments: modeladmin, request, phase, duration (in seconds) and queries.
+phase_finished = Signal()
+
+# Sent when the response of an instrumented subadmin view has been rendered.
+# Arguments: modeladmin, request, response and timings (a SubAdminTimings instance).
+view_finished = Signal()
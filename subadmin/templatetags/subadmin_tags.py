@@ -1,7 +1,5 @@
-from django.urls import reverse
 from django.contrib.admin.templatetags.admin_modify import submit_row
-from django.utils.encoding import force_str
-from django.template import Library
+from django.template import Library, Node
 
 
 register = Library()
@@ -9,44 +7,20 @@ register = Library()
 @register.inclusion_tag('subadmin/breadcrumbs.html', takes_context=True)
 def subadmin_breadcrumbs(context):
     request = context['request']
-    opts = context['opts']
-    root = {
-        'name': request.subadmin.root['object']._meta.app_config.verbose_name,
-        'url': reverse('admin:app_list', kwargs={'app_label': request.subadmin.root['object']._meta.app_label})
-    }
-
-    breadcrumbs =[]
-    view_args = list(request.subadmin.view_args)
-
-    i = 0
-    subadmin_parents = request.subadmin.parents[::-1]
-
-    for parent in subadmin_parents:
-        adm = parent['admin']
-        obj = parent['object']
-
-        breadcrumbs.extend([{
-            'name': obj._meta.verbose_name_plural,
-            'url': adm.reverse_url('changelist', *view_args[:i]),
-            'has_view_permission': adm.has_view_permission(request),
-        }, {
-            'name': force_str(obj),
-            'url': adm.reverse_url('change', *view_args[:i + 1]),
-            'has_view_permission': adm.has_view_permission(request, obj),
-        }])
-        i += 1
+    with request.subadmin.sub_admin.instrument(request, 'breadcrumbs'):
+        breadcrumbs = request.subadmin.breadcrumbs
 
     return {
-        'root': root,
-        'breadcrumbs': breadcrumbs,
-        'opts': opts,
+        'root': breadcrumbs['root'],
+        'breadcrumbs': breadcrumbs['breadcrumbs'],
+        'opts': context['opts'],
     }
 
 @register.simple_tag(takes_context=True)
 def subadmin_url(context, viewname, *args, **kwargs):
-    subadmin = context['request'].subadmin
-    view_args = subadmin.base_url_args[:-1] if subadmin.object_id else subadmin.base_url_args
-    return reverse('admin:%s_%s' % (subadmin.base_viewname, viewname), args=view_args + list(args), kwargs=kwargs)
+    request = context['request']
+    with request.subadmin.sub_admin.instrument(request, 'urls'):
+        return request.subadmin.get_url(viewname, *args, **kwargs)
 
 @register.inclusion_tag('subadmin/submit_line.html', takes_context=True)
 def subadmin_submit_row(context):
@@ -54,4 +28,30 @@ def subadmin_submit_row(context):
     ctx.update({
         'request': context['request']
     })
-    return ctx
\ No newline at end of file
+    return ctx
+
+
+class CachedResultsNode(Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        cl = context['cl']
+        if cl.cached_results is not None:
+            return cl.cached_results
+
+        output = self.nodelist.render(context)
+        if cl.results_cache_key is not None:
+            cl.cache_results(output)
+        return output
+
+
+@register.tag
+def subadmin_cached_results(parser, token):
+    """
+    Render the result table from the changelist's cache, or render and cache it when the changelist can be
+    cached (see SubAdmin.changelist_cache).
+    """
+    nodelist = parser.parse(('endsubadmin_cached_results',))
+    parser.delete_first_token()
+    return CachedResultsNode(nodelist)
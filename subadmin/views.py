@@ -0,0 +1,59 @@
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.http import Http404
+
+
+class SubAdminAutocompleteJsonView(AutocompleteJsonView):
+    """
+    Autocomplete view of a subadmin's subadmin_autocomplete_fields, returning only the objects that belong
+    to the same parents as the object being edited.
+    """
+    sub_admin = None
+
+    def process_request(self, request):
+        term = request.GET.get('term', '')
+        field_name = request.GET.get('field_name')
+        if field_name not in self.sub_admin.subadmin_autocomplete_fields:
+            raise PermissionDenied
+
+        try:
+            source_field = self.sub_admin.model._meta.get_field(field_name)
+        except FieldDoesNotExist as e:
+            raise PermissionDenied from e
+
+        remote_model = source_field.remote_field.model
+        related = self.sub_admin.get_related_subadmin(request, remote_model)
+        if related is None:
+            raise PermissionDenied
+        model_admin, self.url_args = related
+
+        if not model_admin.get_search_fields(request):
+            raise Http404('%s must have search_fields for the autocomplete_view.' % type(model_admin).__qualname__)
+
+        to_field_name = getattr(source_field.remote_field, 'field_name', remote_model._meta.pk.attname)
+        to_field_name = remote_model._meta.get_field(to_field_name).attname
+        if not model_admin.to_field_allowed(request, to_field_name):
+            raise PermissionDenied
+
+        return term, model_admin, source_field, to_field_name
+
+    def get_queryset(self):
+        with self.sub_admin.related_subadmin_helper(self.request, self.model_admin, self.url_args):
+            qs = self.model_admin.get_queryset(self.request)
+            qs = qs.complex_filter(self.source_field.get_limit_choices_to())
+
+            list_select_related = self.model_admin.list_select_related
+            if list_select_related is True:
+                qs = qs.select_related()
+            elif list_select_related:
+                qs = qs.select_related(*list_select_related)
+
+            qs, search_use_distinct = self.model_admin.get_search_results(self.request, qs, self.term)
+        if search_use_distinct:
+            qs = qs.distinct()
+
+        ordering = list(self.model_admin.get_ordering(self.request) or ())
+        return qs.order_by(*ordering + ['-pk'])
+
+    def has_perm(self, request, obj=None):
+        return self.model_admin.has_cached_permission(request, 'view', obj)
@@ -0,0 +1,46 @@
+from django.contrib.admin.widgets import AutocompleteSelect, AutocompleteSelectMultiple, ForeignKeyRawIdWidget
+from django.db.models import UUIDField
+from django.utils.http import urlencode
+from django.utils.translation import gettext as _
+
+
+class SubAdminAutocompleteMixin(object):
+    """
+    Autocomplete widget asking the subadmin's own autocomplete view, which only returns objects under the
+    current parents, instead of the admin site's global one.
+    """
+    def __init__(self, field, admin_site, url, **kwargs):
+        super().__init__(field, admin_site, **kwargs)
+        self.url = url
+
+    def get_url(self):
+        return self.url
+
+
+class SubAdminAutocompleteSelect(SubAdminAutocompleteMixin, AutocompleteSelect):
+    pass
+
+
+class SubAdminAutocompleteSelectMultiple(SubAdminAutocompleteMixin, AutocompleteSelectMultiple):
+    pass
+
+
+class SubAdminForeignKeyRawIdWidget(ForeignKeyRawIdWidget):
+    """
+    Raw id widget looking objects up in a subadmin's changelist under the current parents.
+    """
+    def __init__(self, rel, admin_site, url, attrs=None, using=None):
+        super().__init__(rel, admin_site, attrs, using)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+
+        params = self.url_parameters()
+        context['related_url'] = '%s?%s' % (self.url, urlencode(params)) if params else self.url
+        context['link_title'] = _('Lookup')
+        css_class = 'vForeignKeyRawIdAdminField'
+        if isinstance(self.rel.get_related_field(), UUIDField):
+            css_class += ' vUUIDField'
+        context['widget']['attrs'].setdefault('class', css_class)
+        return context
@@ -0,0 +1,100 @@
+from django.contrib import admin
+
+from subadmin import RootSubAdmin, SubAdmin
+from subadmin.search import SQLiteFTSSearchBackend
+
+from .models import MailingList, Message, Note, Subscriber
+
+
+class NoteSubAdmin(SubAdmin):
+    model = Note
+    list_display = ('text',)
+    ordering = ('text',)
+    keyset_pagination = True
+    list_per_page = 2
+    parent_cache = 'default'
+    instrumentation = True
+    server_timing = True
+    breadcrumbs_cache = 'default'
+
+
+class SubscriberSubAdmin(SubAdmin):
+    model = Subscriber
+    list_display = ('username',)
+    search_fields = ('username',)
+    subadmin_autocomplete_fields = ('referred_by',)
+    ordering = ('-username',)
+    keyset_pagination = True
+    list_per_page = 2
+    parent_cache = 'default'
+    bulk_add = True
+    bulk_add_batch_size = 2
+    export_formats = ('csv', 'jsonl')
+    delete_batch_size = 2
+    delete_summary_threshold = 1
+    subadmins = [NoteSubAdmin]
+
+
+class MessageSubAdmin(SubAdmin):
+    model = Message
+    list_display = ('subject',)
+    subadmin_autocomplete_fields = ('recipient',)
+    search_fields = ('subject', 'recipient__username')
+    search_backend = SQLiteFTSSearchBackend
+    changelist_cache = 'default'
+    bulk_add = True
+    delete_batch_size = 2
+
+
+class MailingListAdmin(RootSubAdmin):
+    list_display = ('name',)
+    subadmins = [SubscriberSubAdmin, MessageSubAdmin]
+    subadmin_link_counts = True
+    subadmin_link_counts_cache = 'default'
+
+
+class FlatMailingListAdmin(MailingListAdmin):
+    flat_subadmin_urls = True
+
+
+class LazyMailingListAdmin(MailingListAdmin):
+    lazy_subadmins = True
+
+
+class BodyMessageSubAdmin(MessageSubAdmin):
+    search_fields = ('subject', 'body')
+
+
+class SearchMailingListAdmin(MailingListAdmin):
+    subadmins = [SubscriberSubAdmin, BodyMessageSubAdmin]
+
+
+class AsyncNoteSubAdmin(NoteSubAdmin):
+    async_views = True
+
+
+class AsyncSubscriberSubAdmin(SubscriberSubAdmin):
+    async_views = True
+    subadmins = [AsyncNoteSubAdmin]
+
+
+class AsyncMailingListAdmin(MailingListAdmin):
+    subadmins = [AsyncSubscriberSubAdmin]
+
+
+admin.site.register(MailingList, MailingListAdmin)
+
+flat_site = admin.AdminSite(name='flat')
+flat_site.register(MailingList, FlatMailingListAdmin)
+
+lazy_site = admin.AdminSite(name='lazy')
+lazy_site.register(MailingList, LazyMailingListAdmin)
+
+async_site = admin.AdminSite(name='async')
+async_site.register(MailingList, AsyncMailingListAdmin)
+
+search_site = admin.AdminSite(name='search')
+search_site.register(MailingList, SearchMailingListAdmin)
+
+other_site = admin.AdminSite(name='other')
+other_site.register(MailingList, MailingListAdmin)
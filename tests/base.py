@@ -0,0 +1,32 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+
+from .models import MailingList
+
+
+class AdminTestCase(TestCase):
+    """
+    Logs a superuser in and starts every test with empty caches, so cached parents, counts and pages don't
+    leak between tests reusing the same primary keys.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client.force_login(self.user)
+
+    def get_subadmin(self, *models, site=admin.site):
+        """
+        Return the subadmin of the last of models, nested in the admins of the ones before it below the
+        root admin of MailingList.
+        """
+        modeladmin = site._registry[MailingList]
+        for model in models:
+            modeladmin = next(modeladmin for modeladmin in modeladmin.subadmin_instances if modeladmin.model is model)
+        return modeladmin
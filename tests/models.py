@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import models
+
+
+class MailingList(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+
+class Subscriber(models.Model):
+    mailing_list = models.ForeignKey(MailingList, on_delete=models.CASCADE)
+    username = models.CharField(max_length=100)
+    referred_by = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        unique_together = [('mailing_list', 'username')]
+
+    def __str__(self):
+        return self.username
+
+
+class Note(models.Model):
+    subscriber = models.ForeignKey(Subscriber, on_delete=models.CASCADE)
+    text = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.text
+
+
+class Receipt(models.Model):
+    subscriber = models.ForeignKey(Subscriber, on_delete=models.PROTECT)
+
+
+class Reply(models.Model):
+    subscriber = models.ForeignKey(Subscriber, on_delete=models.CASCADE)
+    note = models.ForeignKey(Note, on_delete=models.RESTRICT)
+
+    def __str__(self):
+        return 'reply to %s' % self.note
+
+
+class Message(models.Model):
+    mailing_list = models.ForeignKey(MailingList, on_delete=models.CASCADE)
+    recipient = models.ForeignKey(Subscriber, null=True, blank=True, on_delete=models.SET_NULL)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    subject = models.CharField(max_length=100)
+    body = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.subject
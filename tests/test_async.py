@@ -0,0 +1,60 @@
+import asyncio
+from unittest import mock
+
+from django.urls import resolve
+
+from subadmin import SubAdminHelper
+
+from .admin import async_site
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class AsyncViewTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.note = Note.objects.create(subscriber=cls.subscriber, text='hello')
+        cls.url = '/async/tests/mailinglist/%d/subscriber/%d/note/' % (cls.mailing_list.pk, cls.subscriber.pk)
+
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.user)
+
+    def test_views_are_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(resolve(self.url).func))
+        self.assertTrue(asyncio.iscoroutinefunction(resolve(self.url + '%d/change/' % self.note.pk).func))
+        self.assertFalse(asyncio.iscoroutinefunction(resolve(self.url.replace('/async/', '/admin/')).func))
+
+    async def test_changelist(self):
+        with mock.patch.object(SubAdminHelper, 'load_tree') as load_tree:
+            response = await self.async_client.get(self.url)
+        self.assertContains(response, 'hello')
+        # The parents loaded on the event loop are reused by the view.
+        load_tree.assert_not_called()
+        self.assertIs(response.context['cl'].model_admin.async_views, True)
+
+    async def test_change_view(self):
+        response = await self.async_client.get(self.url + '%d/change/' % self.note.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['original'], self.note)
+
+    async def test_mismatched_parents(self):
+        other = await Subscriber.objects.acreate(mailing_list=await MailingList.objects.acreate(name='other'), username='bob')
+        url = '/async/tests/mailinglist/%d/subscriber/%d/note/' % (self.mailing_list.pk, other.pk)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_anonymous_user(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/async/login/', response['Location'])
+
+    async def test_aload_tree(self):
+        sub_admin = self.get_subadmin(Subscriber, Note, site=async_site)
+        helper = await sub_admin.aget_subadmin_helper((str(self.mailing_list.pk), str(self.subscriber.pk)))
+        self.assertEqual([parent['object'] for parent in helper.parents], [self.subscriber, self.mailing_list])
+        self.assertEqual(dict(helper.related_instances), {'subscriber': self.subscriber, 'mailing_list': self.mailing_list})
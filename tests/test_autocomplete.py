@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+
+from .base import AdminTestCase
+from .models import MailingList, Message, Subscriber
+
+
+class AutocompleteTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.alice, cls.bob = [
+            Subscriber.objects.create(mailing_list=cls.mailing_list, username=username) for username in ('alice', 'bob')
+        ]
+        cls.other = Subscriber.objects.create(mailing_list=MailingList.objects.create(name='other'), username='alex')
+        cls.url = '/admin/tests/mailinglist/%d/' % cls.mailing_list.pk
+
+    def autocomplete(self, path, field_name, term=''):
+        return self.client.get(self.url + path, {'field_name': field_name, 'term': term})
+
+    def get_results(self, path, field_name, term=''):
+        response = self.autocomplete(path, field_name, term)
+        self.assertEqual(response.status_code, 200)
+        return [result['text'] for result in response.json()['results']]
+
+    def test_own_model_scoped_to_parent(self):
+        self.assertEqual(self.get_results('subscriber/autocomplete/', 'referred_by'), ['bob', 'alice'])
+        self.assertEqual(self.get_results('subscriber/autocomplete/', 'referred_by', 'al'), ['alice'])
+
+    def test_sibling_scoped_to_parent(self):
+        self.assertEqual(self.get_results('message/autocomplete/', 'recipient', 'al'), ['alice'])
+
+    def test_sibling_get_queryset_applies(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        get_queryset = sub_admin.get_queryset
+        with mock.patch.object(sub_admin, 'get_queryset', lambda request: get_queryset(request).exclude(username='bob')):
+            self.assertEqual(self.get_results('message/autocomplete/', 'recipient'), ['alice'])
+
+    def test_other_fields_denied(self):
+        self.assertEqual(self.autocomplete('message/autocomplete/', 'owner').status_code, 403)
+        self.assertEqual(self.autocomplete('message/autocomplete/', 'subject').status_code, 403)
+
+    def test_related_view_permission_required(self):
+        user = User.objects.create_user('staff', is_staff=True)
+        user.user_permissions.set(Permission.objects.filter(codename__in=['view_mailinglist', 'change_message']))
+        self.client.force_login(user)
+        self.assertEqual(self.autocomplete('message/autocomplete/', 'recipient').status_code, 403)
+
+        user.user_permissions.add(Permission.objects.get(codename='view_subscriber'))
+        self.assertEqual(self.get_results('message/autocomplete/', 'recipient'), ['bob', 'alice'])
+
+    def test_widget_url(self):
+        response = self.client.get(self.url + 'message/add/')
+        self.assertContains(response, 'data-ajax--url="%smessage/autocomplete/"' % self.url)
+        self.assertNotContains(response, '>alex</option>')
+
+    def test_submitted_choice_scoped(self):
+        response = self.client.post(self.url + 'message/add/', {'subject': 'hi', 'body': '', 'recipient': self.other.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('recipient', response.context['adminform'].form.errors)
+
+        response = self.client.post(self.url + 'message/add/', {'subject': 'hi', 'body': '', 'recipient': self.alice.pk})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Message.objects.get().recipient, self.alice)
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.db.models import QuerySet
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Receipt, Subscriber
+
+
+class BatchedDeleteTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscribers = [
+            Subscriber.objects.create(mailing_list=cls.mailing_list, username='user%d' % i) for i in range(5)
+        ]
+        for subscriber in cls.subscribers:
+            Note.objects.create(subscriber=subscriber, text='hello')
+        cls.url = '/admin/tests/mailinglist/%d/subscriber/' % cls.mailing_list.pk
+
+    def delete_selected(self, subscribers):
+        return self.client.post(self.url, {
+            'action': 'delete_selected', 'post': 'yes',
+            helpers.ACTION_CHECKBOX_NAME: [subscriber.pk for subscriber in subscribers],
+        }, follow=True)
+
+    def test_delete_selected_in_batches(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'delete_batch_done', wraps=sub_admin.delete_batch_done) as delete_batch_done:
+            with self.assertLogs('subadmin', 'INFO') as logs:
+                response = self.delete_selected(self.subscribers[:4] + self.subscribers[-1:])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Subscriber.objects.count(), 0)
+        self.assertEqual(Note.objects.count(), 0)
+        self.assertEqual([call.args[2:] for call in delete_batch_done.call_args_list], [(1, 2), (2, 4), (3, 5)])
+        self.assertEqual(logs.output[-1], 'INFO:subadmin:Deleted 5 tests.Subscriber objects in 3 batches')
+        self.assertContains(response, 'Successfully deleted 5 subscribers in 3 batches.')
+        self.assertEqual(LogEntry.objects.filter(action_flag=DELETION).count(), 5)
+
+    def test_batches_follow_primary_keys(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'delete_batch_done') as delete_batch_done:
+            response = self.delete_selected(self.subscribers[1:4])
+        self.assertEqual(delete_batch_done.call_count, 2)
+        self.assertEqual(
+            [str(message) for message in response.context['messages']],
+            ['Successfully deleted 3 subscribers in 2 batches.'],
+        )
+        self.assertEqual(list(Subscriber.objects.order_by('pk')), [self.subscribers[0], self.subscribers[4]])
+
+    def test_fast_delete_batches(self):
+        # Nothing points at receipts, so their batches can be deleted without the collector.
+        sub_admin = self.get_subadmin(Subscriber)
+        Receipt.objects.bulk_create([Receipt(subscriber=self.subscribers[0]) for i in range(3)])
+
+        with mock.patch.object(sub_admin, 'fast_delete_batches', True), \
+                mock.patch('django.db.models.query.QuerySet.delete') as delete:
+            count, batches = sub_admin.delete_in_batches(None, Receipt.objects.filter(subscriber=self.subscribers[0]))
+
+        delete.assert_not_called()
+        self.assertEqual((count, batches), (3, 2))
+        self.assertFalse(Receipt.objects.exists())
+
+    def test_batches_collected_when_needed(self):
+        note_admin = self.get_subadmin(Subscriber, Note)
+        # Replies restrict notes, every batch of notes goes through the collector.
+        with mock.patch.multiple(note_admin, delete_batch_size=2, fast_delete_batches=True), \
+                mock.patch.object(QuerySet, 'delete', autospec=True, side_effect=QuerySet.delete) as delete:
+            count, batches = note_admin.delete_in_batches(None, Note.objects.all())
+        self.assertEqual((count, batches), (5, 3))
+        self.assertEqual(delete.call_count, 3)
+        self.assertFalse(Note.objects.exists())
+
+    def test_delete_view_deletes_cascade_in_batches(self):
+        subscriber = self.subscribers[0]
+        Note.objects.bulk_create([Note(subscriber=subscriber, text='more') for i in range(4)])
+
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'delete_batch_done') as delete_batch_done:
+            response = self.client.post(self.url + '%d/delete/' % subscriber.pk, {'post': 'yes'}, follow=True)
+
+        self.assertEqual(
+            [str(message) for message in response.context['messages']],
+            ['The subscriber "user0" was deleted successfully, along with 5 related objects in 3 batches.'],
+        )
+        self.assertFalse(Subscriber.objects.filter(pk=subscriber.pk).exists())
+        self.assertFalse(Note.objects.filter(subscriber=subscriber.pk).exists())
+        self.assertEqual(delete_batch_done.call_args.args[1:], (Note, 3, 5))
+
+    def test_protected_selection_shows_confirmation(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        protected = ([], {}, set(), ['1 note'])
+        with mock.patch.object(sub_admin, 'get_deleted_objects', return_value=protected):
+            response = self.delete_selected(self.subscribers[:1])
+        self.assertContains(response, 'Cannot delete subscriber')
+        self.assertEqual(Subscriber.objects.count(), 5)
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from subadmin import SubAdminHelper
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class BreadcrumbsCacheTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.url = '/admin/tests/mailinglist/%d/subscriber/%d/note/' % (cls.mailing_list.pk, cls.subscriber.pk)
+
+    def get_breadcrumbs(self):
+        with mock.patch.object(SubAdminHelper, 'get_breadcrumbs', autospec=True, side_effect=SubAdminHelper.get_breadcrumbs) as get_breadcrumbs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, get_breadcrumbs.call_count
+
+    def test_breadcrumbs(self):
+        response, built = self.get_breadcrumbs()
+        self.assertContains(response, '<a href="/admin/tests/">Tests</a>', html=True)
+        self.assertContains(response, '<a href="/admin/tests/mailinglist/%d/change/">News</a>' % self.mailing_list.pk, html=True)
+        self.assertContains(response, '<a href="/admin/tests/mailinglist/%d/subscriber/">Subscribers</a>' % self.mailing_list.pk, html=True)
+
+    def test_cached(self):
+        self.assertEqual(self.get_breadcrumbs()[1], 1)
+        self.assertEqual(self.get_breadcrumbs()[1], 0)
+
+    def test_renamed_parent(self):
+        self.get_breadcrumbs()
+        self.subscriber.username = 'alicia'
+        self.subscriber.save()
+
+        response, built = self.get_breadcrumbs()
+        self.assertEqual(built, 1)
+        self.assertContains(response, '>Alicia</a>')
+
+    def test_permissions_in_key(self):
+        self.get_breadcrumbs()
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'has_view_permission', lambda request, obj=None: obj is None):
+            response, built = self.get_breadcrumbs()
+        self.assertEqual(built, 1)
+        self.assertNotContains(response, 'href="/admin/tests/mailinglist/%d/subscriber/%d/change/"' % (
+            self.mailing_list.pk, self.subscriber.pk))
+
+    def test_cached_per_site(self):
+        self.get_breadcrumbs()
+
+        response = self.client.get(self.url.replace('/admin/', '/other/'))
+        self.assertContains(response, '<a href="/other/tests/">Tests</a>', html=True)
+        self.assertContains(response, '<a href="/other/tests/mailinglist/%d/change/">News</a>' % self.mailing_list.pk, html=True)
+        self.assertNotContains(response, 'href="/admin/tests/')
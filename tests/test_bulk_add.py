@@ -0,0 +1,69 @@
+from django.contrib.admin.models import ADDITION, LogEntry
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from .base import AdminTestCase
+from .models import MailingList, Subscriber
+
+
+class BulkAddTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.other_list = MailingList.objects.create(name='other')
+        Subscriber.objects.create(mailing_list=cls.mailing_list, username='taken')
+        Subscriber.objects.create(mailing_list=cls.other_list, username='elsewhere')
+
+    def setUp(self):
+        super().setUp()
+        self.url = '/admin/tests/mailinglist/%d/subscriber/bulk-add/' % self.mailing_list.pk
+        self.sub_admin = self.get_subadmin(Subscriber)
+
+    def get_forms(self, usernames):
+        request = RequestFactory().post(self.url)
+        request.user = self.user
+        request.subadmin = self.sub_admin.get_subadmin_helper((str(self.mailing_list.pk),), request=request)
+
+        form_class = self.sub_admin.get_form(request)
+        forms = [form_class({'username': username}, defer_unique_checks=True) for username in usernames]
+        for form in forms:
+            self.assertTrue(form.is_valid(), form.errors)
+        return forms
+
+    def test_unique_checks_batched(self):
+        forms = self.get_forms(['a', 'b', 'c', 'taken', 'elsewhere'])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.sub_admin.validate_bulk_unique(forms)
+
+        # One query per bulk_add_batch_size (2) rows for the (mailing_list, username) check.
+        self.assertEqual(len(queries), 3)
+        self.assertEqual([bool(form.errors) for form in forms], [False, False, False, True, False])
+
+    def test_duplicates_within_upload(self):
+        forms = self.get_forms(['a', 'b', 'a'])
+        self.sub_admin.validate_bulk_unique(forms)
+        self.assertEqual([bool(form.errors) for form in forms], [False, False, True])
+
+    def test_csv_upload(self):
+        response = self.client.post(self.url, {'csv': 'username\nnew1\nnew2\n'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            sorted(self.mailing_list.subscriber_set.values_list('username', flat=True)), ['new1', 'new2', 'taken'])
+
+    def test_csv_upload_rejected(self):
+        response = self.client.post(self.url, {'csv': 'username\nnew1\ntaken\n'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['formset'].forms[1].errors)
+        self.assertFalse(self.mailing_list.subscriber_set.filter(username='new1').exists())
+
+    def test_bulk_created_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'csv': 'username\nnew1\nnew2\nnew3\n'}, follow=True)
+
+        inserts = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "tests_subscriber"')]
+        self.assertEqual(len(inserts), 2)
+        self.assertContains(response, 'Added 3 subscribers.')
+        self.assertEqual(LogEntry.objects.filter(action_flag=ADDITION).count(), 3)
@@ -0,0 +1,98 @@
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import AdminTestCase
+from .models import MailingList, Message
+
+
+class ChangelistCacheTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.other_list = MailingList.objects.create(name='other')
+        cls.message = Message.objects.create(mailing_list=cls.mailing_list, subject='hello')
+        cls.url = '/admin/tests/mailinglist/%d/message/' % cls.mailing_list.pk
+
+    def get_changelist(self, url=None, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url or self.url, data)
+        self.assertEqual(response.status_code, 200)
+        message_queries = [query['sql'] for query in queries.captured_queries if 'FROM "tests_message"' in query['sql']]
+        return response, message_queries
+
+    def assert_cached(self, url=None, data=None):
+        response, queries = self.get_changelist(url, data)
+        self.assertEqual(queries, [])
+        return response
+
+    def assert_not_cached(self, url=None, data=None):
+        response, queries = self.get_changelist(url, data)
+        self.assertTrue(queries)
+        return response
+
+    def test_cached(self):
+        self.assert_not_cached()
+        response = self.assert_cached()
+        self.assertContains(response, 'hello')
+        self.assertContains(response, '1 message')
+
+    def test_query_string_in_key(self):
+        self.assert_not_cached()
+        self.assert_not_cached(data={'q': 'hello'})
+        self.assert_cached(data={'q': 'hello'})
+
+    def test_cached_per_user(self):
+        self.assert_not_cached()
+        self.client.force_login(User.objects.create_superuser('other', 'other@example.com', 'password'))
+        self.assert_not_cached()
+
+    def test_save_invalidates(self):
+        self.assert_not_cached()
+        self.message.subject = 'goodbye'
+        self.message.save()
+        self.assertContains(self.assert_not_cached(), 'goodbye')
+
+    def test_delete_invalidates(self):
+        self.assert_not_cached()
+        self.message.delete()
+        self.assertContains(self.assert_not_cached(), '0 messages')
+
+    def test_moved_child_invalidates_previous_parent(self):
+        self.assert_not_cached()
+        self.message.mailing_list = self.other_list
+        self.message.save()
+        self.assertContains(self.assert_not_cached(), '0 messages')
+
+    def test_ancestor_change_invalidates(self):
+        self.assert_not_cached()
+        self.mailing_list.name = 'renamed'
+        self.mailing_list.save()
+        self.assertContains(self.assert_not_cached(), 'Renamed')
+
+    def test_bulk_add_invalidates(self):
+        self.assert_not_cached()
+        response = self.client.post(self.url + 'bulk-add/', {'csv': 'subject\nfirst\nsecond\n'})
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self.assert_not_cached(), '3 messages')
+
+    def test_batched_delete_invalidates(self):
+        self.assert_not_cached()
+        response = self.client.post(self.url, {
+            'action': 'delete_selected', 'post': 'yes', helpers.ACTION_CHECKBOX_NAME: [self.message.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self.assert_not_cached(), '0 messages')
+
+    def test_other_parent_not_invalidated(self):
+        self.assert_not_cached()
+        Message.objects.create(mailing_list=self.other_list, subject='elsewhere')
+        self.assert_cached()
+
+    def test_cached_per_site(self):
+        self.assert_not_cached()
+        response = self.assert_not_cached('/other/tests/mailinglist/%d/message/' % self.mailing_list.pk)
+        self.assertContains(response, '/other/tests/mailinglist/%d/message/%d/' % (self.mailing_list.pk, self.message.pk))
+        self.assert_cached('/other/tests/mailinglist/%d/message/' % self.mailing_list.pk)
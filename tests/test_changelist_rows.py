@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .admin import NoteSubAdmin, SubscriberSubAdmin
+from .base import AdminTestCase
+from .models import MailingList, Note, Receipt, Reply, Subscriber
+
+
+class ChangelistRowURLTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        # One page of notes, see NoteSubAdmin.list_per_page.
+        cls.notes = [Note.objects.create(subscriber=cls.subscriber, text='note %d' % i) for i in range(2)]
+
+    def get_changelist(self):
+        response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (
+            self.mailing_list.pk, self.subscriber.pk))
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_result_urls(self):
+        cl = self.get_changelist()
+        expected = {
+            note.pk: reverse('admin:tests_mailinglist_subscriber_note_change', args=[
+                self.mailing_list.pk, self.subscriber.pk, note.pk,
+            ]) for note in self.notes
+        }
+        self.assertEqual(dict(cl.get_result_urls()), expected)
+        self.assertEqual(cl.url_for_result(self.notes[0]), expected[self.notes[0].pk])
+
+    def test_rows_dont_reverse(self):
+        cl = self.get_changelist()
+        cl.url_for_result(self.notes[0])
+        with mock.patch('subadmin.reverse') as reverse_mock:
+            urls = [cl.url_for_result(note) for note in self.notes]
+        reverse_mock.assert_not_called()
+        self.assertEqual(len(set(urls)), 2)
+
+
+class ChangelistRowPrefetchTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.notes = [Note.objects.create(subscriber=cls.subscriber, text='note %d' % i) for i in range(2)]
+        for note in cls.notes:
+            Reply.objects.create(subscriber=cls.subscriber, note=note)
+        Receipt.objects.create(subscriber=cls.subscriber)
+
+    def get_changelist(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (
+                self.mailing_list.pk, self.subscriber.pk))
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl'], [query['sql'] for query in queries.captured_queries]
+
+    def test_parent_instances_attached(self):
+        cl, queries = self.get_changelist()
+        subscriber = cl.request.subadmin.related_instances['subscriber']
+        for note in cl.result_list:
+            self.assertIs(note.subscriber, subscriber)
+            self.assertTrue(Subscriber._meta.get_field('mailing_list').is_cached(note.subscriber))
+
+    def test_list_prefetch_related(self):
+        with mock.patch.object(NoteSubAdmin, 'list_prefetch_related', ('reply_set',)):
+            cl, queries = self.get_changelist()
+        self.assertEqual(len([sql for sql in queries if 'FROM "tests_reply"' in sql]), 1)
+        for note in cl.result_list:
+            with self.assertNumQueries(0):
+                self.assertEqual(len(note.reply_set.all()), 1)
+
+    def test_inherited_prefetch_related(self):
+        with mock.patch.object(SubscriberSubAdmin, 'inherited_prefetch_related', ('receipt_set',)):
+            cl, queries = self.get_changelist()
+        self.assertEqual(len([sql for sql in queries if 'FROM "tests_receipt"' in sql]), 1)
+        for note in cl.result_list:
+            with self.assertNumQueries(0):
+                self.assertEqual(len(note.subscriber.receipt_set.all()), 1)
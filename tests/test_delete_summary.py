@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Receipt, Reply, Subscriber
+
+
+class DeleteSummaryTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscribers = [
+            Subscriber.objects.create(mailing_list=cls.mailing_list, username=username) for username in 'abc'
+        ]
+        for i, subscriber in enumerate(cls.subscribers):
+            Note.objects.bulk_create([Note(subscriber=subscriber, text='note') for j in range(i + 1)])
+
+    def setUp(self):
+        super().setUp()
+        self.url = '/admin/tests/mailinglist/%d/subscriber/' % self.mailing_list.pk
+
+    def test_delete_view_counts(self):
+        subscriber = self.subscribers[2]
+        response = self.client.get('%s%d/delete/' % (self.url, subscriber.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(dict(response.context['model_count']), {'subscribers': 1, 'notes': 3})
+        self.assertEqual(response.context['deleted_objects'], ['Subscriber: c'])
+        self.assertEqual(response.context['protected'], [])
+
+    def test_delete_selected_counts(self):
+        response = self.client.post(self.url, {
+            'action': 'delete_selected',
+            '_selected_action': [self.subscribers[0].pk, self.subscribers[1].pk],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(dict(response.context['model_count']), {'subscribers': 2, 'notes': 3})
+        self.assertEqual(len(response.context['deletable_objects'][0]), 2)
+
+    def test_protected_counts(self):
+        Receipt.objects.create(subscriber=self.subscribers[0])
+        Receipt.objects.create(subscriber=self.subscribers[0])
+
+        response = self.client.get('%s%d/delete/' % (self.url, self.subscribers[0].pk))
+        self.assertEqual(response.context['protected'], ['2 receipts'])
+
+        response = self.client.post('%s%d/delete/' % (self.url, self.subscribers[0].pk), {'post': 'yes'})
+        self.assertTrue(Subscriber.objects.filter(pk=self.subscribers[0].pk).exists())
+
+    def test_below_threshold(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'delete_summary_threshold', 5):
+            response = self.client.get('%s%d/delete/' % (self.url, self.subscribers[2].pk))
+        # Small deletions are listed in full, like Django does.
+        self.assertEqual(response.context['deleted_objects'], ['Subscriber: c', ['Note: note', 'Note: note', 'Note: note']])
+        self.assertEqual(dict(response.context['model_count']), {'subscribers': 1, 'notes': 3})
+
+    def test_cascade_only_counted(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('%s%d/delete/' % (self.url, self.subscribers[2].pk))
+        note_queries = [query['sql'] for query in queries.captured_queries if 'FROM "tests_note"' in query['sql']]
+        self.assertTrue(note_queries)
+        self.assertTrue(all(sql.startswith('SELECT COUNT(*)') for sql in note_queries))
+
+    def test_collected_once_below_threshold(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'delete_summary_threshold', 5), CaptureQueriesContext(connection) as queries:
+            self.client.get('%s%d/delete/' % (self.url, self.subscribers[2].pk))
+        note_queries = [query['sql'] for query in queries.captured_queries if 'FROM "tests_note"' in query['sql']]
+        self.assertEqual(len(note_queries), 1)
+        self.assertNotIn('COUNT(', note_queries[0])
+
+    def test_collection_stops_at_threshold(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        with mock.patch.object(sub_admin, 'delete_summary_threshold', 3), CaptureQueriesContext(connection) as queries:
+            response = self.client.get('%s%d/delete/' % (self.url, self.subscribers[2].pk))
+        self.assertEqual(response.context['deleted_objects'], ['Subscriber: c'])
+        self.assertEqual(dict(response.context['model_count']), {'subscribers': 1, 'notes': 3})
+        # The collector gave up after loading delete_summary_threshold - 1 notes.
+        self.assertIn('LIMIT 2', [query['sql'] for query in queries.captured_queries if 'FROM "tests_note"' in query['sql']][0])
+
+    def assert_protected(self, subscriber, expected):
+        sub_admin = self.get_subadmin(Subscriber)
+        for threshold in (1, 100):
+            with self.subTest(threshold=threshold), mock.patch.object(sub_admin, 'delete_summary_threshold', threshold):
+                response = self.client.get('%s%d/delete/' % (self.url, subscriber.pk))
+                self.assertEqual(bool(response.context['protected']), expected)
+
+    def test_restricted_within_cascade(self):
+        # The reply restricting the note is deleted along with it.
+        subscriber = self.subscribers[0]
+        Reply.objects.create(subscriber=subscriber, note=subscriber.note_set.get())
+        self.assert_protected(subscriber, False)
+
+    def test_restricted_outside_cascade(self):
+        subscriber = self.subscribers[0]
+        Reply.objects.create(subscriber=self.subscribers[1], note=subscriber.note_set.get())
+        self.assert_protected(subscriber, True)
+
+        response = self.client.get('%s%d/delete/' % (self.url, subscriber.pk))
+        self.assertEqual(response.context['protected'], ['1 reply'])
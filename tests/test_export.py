@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.admin import helpers
+
+from .base import AdminTestCase
+from .models import MailingList, Subscriber
+
+
+class ExportTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscribers = [
+            Subscriber.objects.create(mailing_list=cls.mailing_list, username=username)
+            for username in ('alice', 'bob', 'carol')
+        ]
+        Subscriber.objects.create(mailing_list=MailingList.objects.create(name='other'), username='dave')
+        cls.url = '/admin/tests/mailinglist/%d/subscriber/' % cls.mailing_list.pk
+
+    def get_content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        # Every row is exported, not just the first page, in the admin's ordering.
+        response = self.client.get(self.url + 'export/', {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="subscriber.csv"')
+        self.assertEqual(self.get_content(response).splitlines(), ['username', 'carol', 'bob', 'alice'])
+
+    def test_export_jsonl(self):
+        response = self.client.get(self.url + 'export/', {'format': 'jsonl'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.get_content(response).splitlines()]
+        self.assertEqual(rows, [{'username': 'carol'}, {'username': 'bob'}, {'username': 'alice'}])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(self.url + 'export/', {'format': 'xlsx'}).status_code, 404)
+
+    def test_export_link(self):
+        self.assertContains(self.client.get(self.url), 'export/?format=jsonl')
+
+    def test_export_selected(self):
+        response = self.client.post(self.url, {
+            'action': 'export_csv',
+            helpers.ACTION_CHECKBOX_NAME: [self.subscribers[0].pk, self.subscribers[2].pk],
+        })
+        self.assertEqual(self.get_content(response).splitlines(), ['username', 'carol', 'alice'])
@@ -0,0 +1,50 @@
+from django.urls import resolve, reverse
+
+from .admin import flat_site
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class FlatURLTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.other_list = MailingList.objects.create(name='other')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.note = Note.objects.create(subscriber=cls.subscriber, text='hello')
+
+    def test_nested_views(self):
+        base = '/flat/tests/mailinglist/%d/subscriber/%d/note/' % (self.mailing_list.pk, self.subscriber.pk)
+        response = self.client.get(base)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [self.note])
+
+        response = self.client.get('%s%d/change/' % (base, self.note.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['original'], self.note)
+
+    def test_parents_matched_by_converter(self):
+        match = resolve('/flat/tests/mailinglist/%d/subscriber/' % self.mailing_list.pk)
+        self.assertEqual(match.url_name, 'tests_mailinglist_subscriber_changelist')
+        self.assertEqual(match.route, 'flat/tests/mailinglist/<int:parent_0>/subscriber/')
+
+        # A parent the converter rejects falls through to the root admin's own patterns.
+        match = resolve('/flat/tests/mailinglist/abc/subscriber/')
+        self.assertNotEqual(match.url_name, 'tests_mailinglist_subscriber_changelist')
+        self.assertEqual(self.client.get('/flat/tests/mailinglist/%d/subscriber/%d/note/' % (
+            self.other_list.pk, self.subscriber.pk)).status_code, 404)
+
+    def test_same_url_names(self):
+        sub_admin = self.get_subadmin(Subscriber, Note, site=flat_site)
+        url = sub_admin.reverse_url('change', self.mailing_list.pk, self.subscriber.pk, self.note.pk)
+        self.assertEqual(url, '/flat/tests/mailinglist/%d/subscriber/%d/note/%d/change/' % (
+            self.mailing_list.pk, self.subscriber.pk, self.note.pk))
+        self.assertEqual(url, reverse(
+            'admin:tests_mailinglist_subscriber_note_change', current_app='flat',
+            args=[self.mailing_list.pk, self.subscriber.pk, self.note.pk],
+        ))
+        self.assertEqual(
+            self.get_subadmin(Subscriber, Note).reverse_url('change', self.mailing_list.pk, self.subscriber.pk, self.note.pk),
+            url.replace('/flat/', '/admin/', 1),
+        )
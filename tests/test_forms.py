@@ -0,0 +1,50 @@
+from django import forms
+from django.test import RequestFactory
+
+from .base import AdminTestCase
+from .models import MailingList, Subscriber
+
+
+class SubAdminFormTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.other_list = MailingList.objects.create(name='other')
+        Subscriber.objects.create(mailing_list=cls.mailing_list, username='taken')
+
+    def setUp(self):
+        super().setUp()
+        self.sub_admin = self.get_subadmin(Subscriber)
+
+    def get_request(self, mailing_list):
+        request = RequestFactory().get('/admin/tests/mailinglist/%d/subscriber/add/' % mailing_list.pk)
+        request.user = self.user
+        request.subadmin = self.sub_admin.get_subadmin_helper((str(mailing_list.pk),), request=request)
+        return request
+
+    def test_factory_class_not_subclassed(self):
+        form_class = self.sub_admin.get_form(self.get_request(self.mailing_list))
+        # Only the factory class and the class ModelAdmin.get_form() derives from form for readonly fields.
+        self.assertEqual(form_class.__mro__.index(self.sub_admin.form), 2)
+
+    def test_changelist_factory_class_not_subclassed(self):
+        form_class = self.sub_admin.get_changelist_form(self.get_request(self.mailing_list))
+        self.assertEqual(form_class.__bases__, (self.sub_admin.get_subadmin_form_class(forms.ModelForm),))
+
+    def test_related_instances_per_request(self):
+        form_class = self.sub_admin.get_form(self.get_request(self.mailing_list))
+        other_form_class = self.sub_admin.get_form(self.get_request(self.other_list))
+
+        form = form_class({'username': 'taken'})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.instance.mailing_list, self.mailing_list)
+
+        other_form = other_form_class({'username': 'taken'})
+        self.assertTrue(other_form.is_valid(), other_form.errors)
+        self.assertEqual(other_form.instance.mailing_list, self.other_list)
+
+    def test_shared_class_not_modified(self):
+        form_class = self.sub_admin.prep_subadmin_form(self.get_request(self.mailing_list), self.sub_admin.form)
+        self.assertEqual(form_class.__bases__, (self.sub_admin.form,))
+        self.assertNotIn('_related_instances', vars(self.sub_admin.form))
@@ -0,0 +1,56 @@
+from subadmin.signals import phase_finished, view_finished
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class InstrumentationTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        Note.objects.create(subscriber=cls.subscriber, text='hello')
+        cls.subscriber_url = '/admin/tests/mailinglist/%d/subscriber/' % cls.mailing_list.pk
+        cls.note_url = '%s%d/note/' % (cls.subscriber_url, cls.subscriber.pk)
+
+    def connect(self, signal):
+        calls = []
+
+        def receiver(**kwargs):
+            calls.append(kwargs)
+        signal.connect(receiver)
+        self.addCleanup(signal.disconnect, receiver)
+        return calls
+
+    def test_server_timing(self):
+        response = self.client.get(self.note_url)
+        self.assertEqual(response.status_code, 200)
+
+        phases = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        # Phases are listed in the order they finished, nested ones before the phase around them.
+        self.assertEqual(phases, ['tree', 'permissions', 'prefetch', 'changelist', 'view', 'breadcrumbs', 'urls', 'render'])
+        self.assertRegex(response['Server-Timing'], r'tree;dur=[\d.]+;desc="queries: [1-9]\d*"')
+
+    def test_phase_signals(self):
+        phases = self.connect(phase_finished)
+        views = self.connect(view_finished)
+        note_admin = self.get_subadmin(Subscriber, Note)
+
+        response = self.client.get(self.note_url)
+
+        self.assertEqual(len(views), 1)
+        self.assertEqual({call['phase'] for call in phases}, set(views[0]['timings'].phases))
+        self.assertTrue(all(call['modeladmin'] is note_admin and call['duration'] >= 0 for call in phases))
+        self.assertIs(views[0]['response'], response)
+        self.assertEqual(list(views[0]['timings'].phases), [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')])
+
+    def test_log(self):
+        with self.assertLogs('subadmin', 'DEBUG') as logs:
+            self.client.get(self.note_url)
+        self.assertRegex(logs.output[-1], r'^DEBUG:subadmin:GET %s: tree [\d.]+ms \(\d+ queries\), ' % self.note_url)
+
+    def test_not_instrumented(self):
+        response = self.client.get(self.subscriber_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Server-Timing'))
@@ -0,0 +1,83 @@
+from urllib.parse import parse_qs
+
+from subadmin import CURSOR_VAR
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class KeysetPaginationTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscribers = [
+            Subscriber.objects.create(mailing_list=cls.mailing_list, username=username) for username in 'abcde'
+        ]
+        Subscriber.objects.create(mailing_list=MailingList.objects.create(name='other'), username='z')
+
+        # Equal texts make the seek predicate fall back to the primary key.
+        cls.subscriber = cls.subscribers[0]
+        for text in ('x', 'x', 'x', 'y', 'x'):
+            Note.objects.create(subscriber=cls.subscriber, text=text)
+
+    def setUp(self):
+        super().setUp()
+        self.subscriber_url = '/admin/tests/mailinglist/%d/subscriber/' % self.mailing_list.pk
+        self.note_url = '%s%d/note/' % (self.subscriber_url, self.subscriber.pk)
+
+    def get_page(self, url, query_string=''):
+        response = self.client.get(url + query_string)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def walk(self, url, attr='next_page_url'):
+        cl = self.get_page(url)
+        pages = [list(cl.result_list)]
+        while getattr(cl, attr):
+            cl = self.get_page(url, getattr(cl, attr))
+            pages.append(list(cl.result_list))
+        return pages, cl
+
+    def test_keys(self):
+        cl = self.get_page(self.subscriber_url)
+        self.assertEqual(
+            [(field.name, descending) for field, descending in cl.get_keyset_keys()], [('username', True), ('id', True)])
+
+        # The changelist breaks ties with -pk.
+        cl = self.get_page(self.note_url)
+        self.assertEqual(
+            [(field.name, descending) for field, descending in cl.get_keyset_keys()], [('text', False), ('id', True)])
+
+    def test_next_pages(self):
+        pages, cl = self.walk(self.subscriber_url)
+        self.assertEqual([[obj.username for obj in page] for page in pages], [['e', 'd'], ['c', 'b'], ['a']])
+        self.assertTrue(cl.keyset_pagination)
+        self.assertEqual(cl.result_count, 5)
+        self.assertIsNotNone(cl.previous_page_url)
+
+    def test_previous_page(self):
+        cl = self.get_page(self.subscriber_url)
+        cl = self.get_page(self.subscriber_url, cl.next_page_url)
+        cl = self.get_page(self.subscriber_url, cl.next_page_url)
+        cl = self.get_page(self.subscriber_url, cl.previous_page_url)
+        self.assertEqual([obj.username for obj in cl.result_list], ['c', 'b'])
+        self.assertIsNotNone(cl.next_page_url)
+
+    def test_seek_past_equal_values(self):
+        pages, cl = self.walk(self.note_url)
+        notes = [note for page in pages for note in page]
+        expected = list(Note.objects.filter(subscriber=self.subscriber).order_by('text', '-pk'))
+        self.assertEqual(notes, expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+    def test_cursor_round_trip(self):
+        cl = self.get_page(self.subscriber_url)
+        keys = cl.get_keyset_keys()
+        cursor = parse_qs(cl.next_page_url.lstrip('?'))[CURSOR_VAR][0]
+        self.assertEqual(cl.decode_cursor(keys, cursor), ('n', ['d', self.subscribers[3].pk]))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.subscriber_url + '?%s=garbage' % CURSOR_VAR)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].endswith('?e=1'))
@@ -0,0 +1,60 @@
+from django.contrib.admin import AdminSite
+from django.urls import path
+from django.urls.resolvers import RegexPattern, URLResolver
+
+from .admin import LazyMailingListAdmin, NoteSubAdmin, SubscriberSubAdmin
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class LazySubAdminTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.note = Note.objects.create(subscriber=cls.subscriber, text='hello')
+
+    def get_root_admin(self):
+        site = AdminSite(name='lazy_test')
+        site.register(MailingList, LazyMailingListAdmin)
+        return site, site._registry[MailingList]
+
+    def is_loaded(self, modeladmin):
+        return 'subadmin_instances' in vars(modeladmin)
+
+    def test_registering_doesnt_load(self):
+        site, root_admin = self.get_root_admin()
+        site.urls
+        self.assertFalse(self.is_loaded(root_admin))
+
+    def test_resolve_loads_one_branch(self):
+        site, root_admin = self.get_root_admin()
+        resolver = URLResolver(RegexPattern(r'^/'), [path('lazy/', site.urls)])
+
+        match = resolver.resolve('/lazy/tests/mailinglist/%d/subscriber/' % self.mailing_list.pk)
+        self.assertEqual(match.url_name, 'tests_mailinglist_subscriber_changelist')
+        self.assertTrue(self.is_loaded(root_admin))
+        self.assertFalse(self.is_loaded(root_admin.get_subadmin_instance(SubscriberSubAdmin)))
+
+        # Reversing any admin URL, like django.urls.reverse('admin:index') does on every admin page, needs the
+        # patterns of the whole tree.
+        prefix, admin_resolver = resolver.namespace_dict[site.name]
+        admin_resolver.reverse('index')
+        self.assertTrue(self.is_loaded(root_admin.get_subadmin_instance(SubscriberSubAdmin)))
+
+    def test_views(self):
+        base = '/lazy/tests/mailinglist/%d/subscriber/%d/note/' % (self.mailing_list.pk, self.subscriber.pk)
+        response = self.client.get(base)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [self.note])
+        self.assertEqual(response.context['cl'].url_for_result(self.note), '%s%d/change/' % (base, self.note.pk))
+
+    def test_signals_load_subadmins(self):
+        site, root_admin = self.get_root_admin()
+        self.assertTrue(root_admin.lazy_receivers)
+
+        self.subscriber.save()
+        subscriber_admin = root_admin.get_subadmin_instance(SubscriberSubAdmin)
+        self.assertTrue(self.is_loaded(subscriber_admin))
+        self.assertIsInstance(subscriber_admin.get_subadmin_instance(NoteSubAdmin), NoteSubAdmin)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django.contrib.auth.models import User
+
+from .admin import other_site
+from .base import AdminTestCase
+from .models import MailingList, Subscriber
+
+
+class LinkCountTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        for username in ('alice', 'bob'):
+            Subscriber.objects.create(mailing_list=cls.mailing_list, username=username)
+        Subscriber.objects.create(mailing_list=MailingList.objects.create(name='other'), username='carol')
+
+    def get_change_form(self, prefix='admin'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/%s/tests/mailinglist/%d/change/' % (prefix, self.mailing_list.pk))
+        self.assertEqual(response.status_code, 200)
+        count_queries = [query['sql'] for query in queries.captured_queries if 'subadmin_count_' in query['sql']]
+        return response, count_queries
+
+    def test_counts_shown_next_to_links(self):
+        response, count_queries = self.get_change_form()
+        self.assertContains(response, 'subscribers (2)')
+        self.assertEqual(len(count_queries), 1)
+
+    def test_counts_respect_get_queryset(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        get_queryset = sub_admin.get_queryset
+        with mock.patch.object(sub_admin, 'get_queryset', lambda request: get_queryset(request).filter(username='bob')):
+            response, count_queries = self.get_change_form()
+        self.assertContains(response, 'subscribers (1)')
+
+    def test_counts_cached(self):
+        self.get_change_form()
+        Subscriber.objects.create(mailing_list=self.mailing_list, username='dave')
+
+        response, count_queries = self.get_change_form()
+        self.assertContains(response, 'subscribers (2)')
+        self.assertEqual(count_queries, [])
+
+    def test_counts_cached_per_site(self):
+        self.get_change_form()
+
+        sub_admin = self.get_subadmin(Subscriber, site=other_site)
+        get_queryset = sub_admin.get_queryset
+        with mock.patch.object(sub_admin, 'get_queryset', lambda request: get_queryset(request).filter(username='bob')):
+            response, count_queries = self.get_change_form('other')
+        self.assertContains(response, 'subscribers (1)')
+
+    def test_counts_cached_per_user(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        get_queryset = sub_admin.get_queryset
+        restricted = lambda request: get_queryset(request).filter(username__gte=request.user.username)
+        other_user = User.objects.create_superuser('amy', 'amy@example.com', 'password')
+
+        with mock.patch.object(sub_admin, 'get_queryset', restricted):
+            self.assertContains(self.get_change_form()[0], 'subscribers (2)')
+            self.client.force_login(other_user)
+            self.assertContains(self.get_change_form()[0], 'subscribers (1)')
+
+        with mock.patch.object(sub_admin, 'get_queryset', restricted), \
+                mock.patch.object(self.get_subadmin(), 'subadmin_link_counts_per_user', False):
+            self.assertContains(self.get_change_form()[0], 'subscribers (1)')
+            self.client.force_login(self.user)
+            response, count_queries = self.get_change_form()
+            self.assertContains(response, 'subscribers (1)')
+            self.assertEqual(count_queries, [])
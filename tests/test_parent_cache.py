@@ -0,0 +1,54 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class ParentCacheTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+
+    def setUp(self):
+        super().setUp()
+        self.sub_admin = self.get_subadmin(Subscriber, Note)
+        self.url = '/admin/tests/mailinglist/%d/subscriber/%d/note/' % (self.mailing_list.pk, self.subscriber.pk)
+
+    def test_parent_cached_across_requests(self):
+        self.assertIsNone(self.sub_admin.get_cached_parent_instance(self.subscriber.pk))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        cached = self.sub_admin.get_cached_parent_instance(self.subscriber.pk)
+        self.assertEqual(cached, self.subscriber)
+        self.assertEqual(cached.username, 'alice')
+        # Ancestors are cached by their own subadmins, they aren't pickled along.
+        self.assertFalse(cached._state.fields_cache)
+
+    def test_cached_parents_are_served(self):
+        # The cache is only used when every level of the tree is cached, the mailing list is too.
+        self.client.get(self.url)
+        MailingList.objects.filter(pk=self.mailing_list.pk).update(name='renamed')
+        Subscriber.objects.filter(pk=self.subscriber.pk).update(username='renamed')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        parent_tables = ('FROM "tests_subscriber"', 'FROM "tests_mailinglist"')
+        self.assertFalse([query for query in queries if any(table in query['sql'] for table in parent_tables)])
+        self.assertEqual(response.context['parent_instance'].username, 'alice')
+        self.assertEqual(response.context['parent_instance'].mailing_list.name, 'news')
+
+    def test_save_and_delete_invalidate(self):
+        self.client.get(self.url)
+        self.subscriber.username = 'renamed'
+        self.subscriber.save()
+        self.assertIsNone(self.sub_admin.get_cached_parent_instance(self.subscriber.pk))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['parent_instance'].username, 'renamed')
+
+        self.subscriber.delete()
+        self.assertIsNone(self.sub_admin.get_cached_parent_instance(self.subscriber.pk))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
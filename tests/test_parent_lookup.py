@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from subadmin.checks import check_subadmin_indexes
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class ParentLookupTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        Note.objects.create(subscriber=cls.subscriber, text='hello')
+
+    def get_note_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (
+                self.mailing_list.pk, self.subscriber.pk))
+        self.assertContains(response, 'hello')
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT "tests_note"')]
+
+    def test_filters_on_ancestor_chain(self):
+        queries = self.get_note_queries()
+        self.assertTrue(queries)
+        self.assertTrue(all('JOIN "tests_subscriber"' in sql for sql in queries))
+
+    def test_direct_parent_lookup(self):
+        with mock.patch.object(self.get_subadmin(Subscriber, Note), 'direct_parent_lookup', True):
+            queries = self.get_note_queries()
+        self.assertTrue(queries)
+        self.assertFalse(any('JOIN' in sql for sql in queries))
+
+
+class IndexCheckTests(AdminTestCase):
+    def test_indexed_foreign_keys(self):
+        self.assertEqual(check_subadmin_indexes(), [])
+
+    def test_unindexed_foreign_key(self):
+        # Subscriber.mailing_list still leads the unique_together index.
+        with mock.patch.object(Note._meta.get_field('subscriber'), 'db_index', False), \
+                mock.patch.object(Subscriber._meta.get_field('mailing_list'), 'db_index', False):
+            errors = check_subadmin_indexes()
+        self.assertEqual([error.id for error in errors], ['subadmin.W001'])
+        self.assertIn("'tests.Note.subscriber'", errors[0].msg)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.test import RequestFactory
+
+from subadmin import SubAdminRequestCache
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class PermissionCacheTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+
+    def get_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return request
+
+    def test_checks_memoized_per_request(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        request = self.get_request()
+
+        with mock.patch.object(sub_admin, 'has_view_permission', return_value=True) as has_view_permission:
+            for i in range(3):
+                self.assertTrue(sub_admin.has_cached_permission(request, 'view'))
+                self.assertTrue(sub_admin.has_cached_permission(request, 'view', self.subscriber))
+            self.assertEqual(has_view_permission.call_count, 2)
+
+            sub_admin.has_cached_permission(self.get_request(), 'view')
+            self.assertEqual(has_view_permission.call_count, 3)
+
+    def test_get_permissions_answers_checks(self):
+        sub_admin = self.get_subadmin(Subscriber)
+        request = self.get_request()
+        checks = [(sub_admin, 'change', None), (sub_admin, 'change', self.subscriber)]
+
+        with mock.patch.object(sub_admin, 'get_permissions', return_value={checks[1]: False}) as get_permissions, \
+                mock.patch.object(sub_admin, 'has_change_permission', return_value=True) as has_change_permission:
+            SubAdminRequestCache.for_request(request).prefetch_permissions(request, sub_admin, checks)
+            self.assertFalse(sub_admin.has_cached_permission(request, 'change', self.subscriber))
+            self.assertTrue(sub_admin.has_cached_permission(request, 'change'))
+
+        get_permissions.assert_called_once_with(request, checks)
+        # Only the check get_permissions() left out falls back to has_change_permission().
+        has_change_permission.assert_called_once_with(request, None)
+
+    def test_page_checks_each_permission_once(self):
+        root_admin = self.get_subadmin()
+        with mock.patch.object(root_admin, 'has_view_permission', wraps=root_admin.has_view_permission) as has_view_permission:
+            response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (
+                self.mailing_list.pk, self.subscriber.pk))
+        self.assertEqual(response.status_code, 200)
+
+        calls = [call.args[1:] for call in has_view_permission.call_args_list]
+        self.assertTrue(calls)
+        self.assertEqual(len(calls), len(set(calls)))
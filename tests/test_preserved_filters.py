@@ -0,0 +1,41 @@
+from unittest import mock
+
+from .base import AdminTestCase
+from .models import MailingList, Subscriber
+
+
+class PreservedFilterTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.url = '/admin/tests/mailinglist/%d/subscriber/' % cls.mailing_list.pk
+
+    def add_preserved_filters(self, url, **kwargs):
+        sub_admin = self.get_subadmin(Subscriber)
+        context = {'opts': Subscriber._meta, 'preserved_filters': '_changelist_filters=q%3Dali'}
+        return sub_admin.add_preserved_filters(context, url, **kwargs)
+
+    def test_viewname_skips_resolve(self):
+        change_url = '%s%d/change/' % (self.url, self.subscriber.pk)
+        with mock.patch('subadmin.resolve') as resolve:
+            self.assertEqual(self.add_preserved_filters(self.url, viewname='changelist'), self.url + '?q=ali')
+            self.assertEqual(
+                self.add_preserved_filters(change_url, viewname='change'), change_url + '?_changelist_filters=q%3Dali'
+            )
+        resolve.assert_not_called()
+
+    def test_url_resolved_without_viewname(self):
+        self.assertEqual(self.add_preserved_filters(self.url), self.url + '?q=ali')
+        change_url = '%s%d/change/' % (self.url, self.subscriber.pk)
+        self.assertEqual(self.add_preserved_filters(change_url), change_url + '?_changelist_filters=q%3Dali')
+
+    def test_redirect_keeps_filters(self):
+        with mock.patch('subadmin.resolve') as resolve:
+            response = self.client.post(
+                '%s%d/change/?_changelist_filters=q%%3Dali' % (self.url, self.subscriber.pk),
+                {'username': 'alicia'},
+            )
+        self.assertRedirects(response, self.url + '?q=ali', fetch_redirect_response=False)
+        resolve.assert_not_called()
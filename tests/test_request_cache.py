@@ -0,0 +1,39 @@
+from django.test import RequestFactory
+
+from subadmin import SubAdminHelper, SubAdminRequestCache
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class RequestCacheTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+
+    def get_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return request
+
+    def test_helpers_share_parents(self):
+        request = self.get_request()
+        view_args = (str(self.mailing_list.pk), str(self.subscriber.pk))
+        helper = SubAdminHelper(self.get_subadmin(Subscriber, Note), view_args, request=request)
+
+        with self.assertNumQueries(0):
+            other = SubAdminHelper(self.get_subadmin(Subscriber), view_args, object_id=view_args[-1], request=request)
+
+        self.assertIs(helper.cache, SubAdminRequestCache.for_request(request))
+        self.assertIs(other.parent_instance, helper.root['object'])
+        self.assertEqual(helper.cache.hits, 1)
+
+    def test_requests_dont_share_parents(self):
+        view_args = (str(self.mailing_list.pk),)
+        helper = SubAdminHelper(self.get_subadmin(Subscriber), view_args, request=self.get_request())
+        other = SubAdminHelper(self.get_subadmin(Subscriber), view_args, request=self.get_request())
+
+        self.assertIsNot(other.cache, helper.cache)
+        self.assertIsNot(other.parent_instance, helper.parent_instance)
@@ -0,0 +1,87 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .admin import search_site
+from .base import AdminTestCase
+from .models import MailingList, Message, Subscriber
+
+
+class SQLiteFTSSearchTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        alice = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        Message.objects.create(mailing_list=cls.mailing_list, subject='Weekly digest', recipient=alice)
+        Message.objects.create(mailing_list=cls.mailing_list, subject='Monthly report')
+        Message.objects.create(mailing_list=MailingList.objects.create(name='other'), subject='Weekly news')
+        Message.objects.create(mailing_list=cls.mailing_list, subject='Offers', body='This week only')
+        cls.url = '/admin/tests/mailinglist/%d/message/' % cls.mailing_list.pk
+
+    def setUp(self):
+        super().setUp()
+        # The index tables are rolled back with every test, the backend must look for them again.
+        self.backend = self.get_subadmin(Message).get_search_backend()
+        self.body_backend = self.get_subadmin(Message, site=search_site).get_search_backend()
+        for backend in (self.backend, self.body_backend):
+            self.addCleanup(backend.tables_found.clear)
+
+    def search(self, term, prefix='admin'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url.replace('/admin/', '/%s/' % prefix), {'q': term})
+        self.assertEqual(response.status_code, 200)
+        sql = [query['sql'] for query in queries.captured_queries if 'FROM "tests_message"' in query['sql']]
+        return [message.subject for message in response.context['cl'].result_list], ' '.join(sql)
+
+    def rebuild(self):
+        stdout = io.StringIO()
+        call_command('rebuild_subadmin_search', stdout=stdout)
+        return stdout.getvalue()
+
+    def test_falls_back_without_index(self):
+        results, sql = self.search('week')
+        self.assertEqual(results, ['Weekly digest'])
+        self.assertIn('LIKE', sql)
+        self.assertNotIn('MATCH', sql)
+
+    def test_index_search(self):
+        self.rebuild()
+        results, sql = self.search('week')
+        self.assertEqual(results, ['Weekly digest'])
+        self.assertIn('MATCH', sql)
+        self.assertNotIn('LIKE', sql)
+
+        self.assertEqual(self.search('ali')[0], ['Weekly digest'])
+        self.assertEqual(self.search('"monthly report"')[0], ['Monthly report'])
+        self.assertEqual(self.search('weekly report')[0], [])
+
+    def test_index_updated_by_signals(self):
+        self.rebuild()
+        message = Message.objects.create(mailing_list=self.mailing_list, subject='Weekly offers')
+        self.assertEqual(sorted(self.search('week')[0]), ['Weekly digest', 'Weekly offers'])
+
+        message.subject = 'Special offers'
+        message.save()
+        self.assertEqual(self.search('week')[0], ['Weekly digest'])
+
+        Message.objects.get(subject='Weekly digest').delete()
+        self.assertEqual(self.search('week')[0], [])
+
+    def test_rebuild_command(self):
+        # The admin sites share the index of MessageSubAdmin, BodyMessageSubAdmin searches other fields.
+        self.assertEqual(self.rebuild(), 'Rebuilt SQLiteFTSSearchBackend search index of tests.Message.\n' * 2)
+        self.assertNotEqual(self.backend.table, self.body_backend.table)
+        with connection.cursor() as cursor:
+            for backend in (self.backend, self.body_backend):
+                cursor.execute('SELECT COUNT(*) FROM %s' % connection.ops.quote_name(backend.table))
+                self.assertEqual(cursor.fetchone()[0], 4)
+
+    def test_index_per_search_fields(self):
+        self.rebuild()
+        self.assertEqual(self.search('week')[0], ['Weekly digest'])
+        results, sql = self.search('week', 'search')
+        self.assertEqual(sorted(results), ['Offers', 'Weekly digest'])
+        self.assertIn('MATCH', sql)
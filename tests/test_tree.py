@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.db.models import Manager
+from django.http import Http404
+from django.test import RequestFactory
+
+from subadmin import SubAdminHelper
+
+from .base import AdminTestCase
+from .models import MailingList, Note, Subscriber
+
+
+class TreeVerificationTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mailing_list = MailingList.objects.create(name='news')
+        cls.other_list = MailingList.objects.create(name='other')
+        cls.subscriber = Subscriber.objects.create(mailing_list=cls.mailing_list, username='alice')
+        cls.other_subscriber = Subscriber.objects.create(mailing_list=cls.other_list, username='bob')
+        Note.objects.create(subscriber=cls.subscriber, text='hello')
+
+    def get_helper(self, subscriber, **kwargs):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return SubAdminHelper(
+            self.get_subadmin(Subscriber, Note), (str(self.mailing_list.pk), str(subscriber.pk)), request=request, **kwargs
+        )
+
+    def test_nested_changelist(self):
+        response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (
+            self.mailing_list.pk, self.subscriber.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([note.text for note in response.context['cl'].result_list], ['hello'])
+
+    def test_ancestors_that_dont_belong_to_each_other(self):
+        response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (
+            self.mailing_list.pk, self.other_subscriber.pk))
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_and_invalid_parents(self):
+        for path in ('/admin/tests/mailinglist/0/subscriber/', '/admin/tests/mailinglist/abc/subscriber/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_ancestors_joined_in_one_query(self):
+        helper = self.get_helper(self.subscriber, load=False)
+        levels = helper.get_tree_levels(helper.sub_admin)
+
+        with self.assertNumQueries(1):
+            objects = helper.fetch_tree(levels)
+        self.assertEqual(objects, [self.subscriber, self.mailing_list])
+
+        helper.verify_tree(levels, objects)
+        self.assertTrue(helper.tree_verified)
+
+    def test_verify_tree_rejects_mismatched_ancestors(self):
+        helper = self.get_helper(self.other_subscriber, load=False)
+        levels = helper.get_tree_levels(helper.sub_admin)
+
+        with self.assertRaises(Http404):
+            helper.verify_tree(levels, [self.other_subscriber, self.mailing_list])
+
+    def test_ancestors_hidden_by_default_manager(self):
+        class VisibleManager(Manager):
+            def get_queryset(self):
+                return super().get_queryset().exclude(name__startswith='hidden')
+
+        manager = VisibleManager()
+        manager.model = MailingList
+        hidden = MailingList.objects.create(name='hidden')
+        subscriber = Subscriber.objects.create(mailing_list=hidden, username='carol')
+
+        # Joining the chain would bypass the manager of the ancestors, so they are fetched on their own.
+        with mock.patch.dict(MailingList._meta.__dict__, {'default_manager': manager}):
+            response = self.client.get('/admin/tests/mailinglist/%d/subscriber/%d/note/' % (hidden.pk, subscriber.pk))
+        self.assertEqual(response.status_code, 404)
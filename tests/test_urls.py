@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.urls import NoReverseMatch, clear_script_prefix, reverse, set_script_prefix
+
+from .admin import flat_site
+from .base import AdminTestCase
+from .models import Note, Subscriber
+
+
+class ReverseURLTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sub_admin = self.get_subadmin(Subscriber, Note)
+        self.sub_admin.url_templates.clear()
+
+    def test_matches_reverse(self):
+        for viewname, args in [
+            ('changelist', ['1', '2']),
+            ('add', ['1', '2']),
+            ('change', ['1', '2', '3']),
+            ('delete', ['10', 'a b', 'x/y?z#']),
+            ('history', ['1', '2', 'ünï{0}']),
+        ]:
+            with self.subTest(viewname=viewname, args=args):
+                self.assertEqual(
+                    self.sub_admin.reverse_url(viewname, *args),
+                    reverse('admin:tests_mailinglist_subscriber_note_%s' % viewname, args=args),
+                )
+
+    def test_template_memoized(self):
+        self.sub_admin.reverse_url('change', 1, 2, 3)
+        with mock.patch('subadmin.reverse') as reverse_mock:
+            url = self.sub_admin.reverse_url('change', 4, 5, 6)
+        reverse_mock.assert_not_called()
+        self.assertEqual(url, '/admin/tests/mailinglist/4/subscriber/5/note/6/change/')
+
+    def test_url_builder(self):
+        build = self.sub_admin.get_url_builder('change', 1, 2)
+        self.assertEqual(build(3), '/admin/tests/mailinglist/1/subscriber/2/note/3/change/')
+        self.assertEqual(build('a b'), '/admin/tests/mailinglist/1/subscriber/2/note/a%20b/change/')
+
+    def test_keyed_by_script_prefix(self):
+        self.assertEqual(self.sub_admin.reverse_url('changelist', 1, 2), '/admin/tests/mailinglist/1/subscriber/2/note/')
+        set_script_prefix('/prefix/')
+        try:
+            self.assertEqual(
+                self.sub_admin.reverse_url('changelist', 1, 2), '/prefix/admin/tests/mailinglist/1/subscriber/2/note/')
+        finally:
+            clear_script_prefix()
+        self.assertEqual(self.sub_admin.reverse_url('changelist', 1, 2), '/admin/tests/mailinglist/1/subscriber/2/note/')
+
+    def test_arguments_checked_like_reverse(self):
+        self.sub_admin.reverse_url('changelist', 1, 2)
+        with self.assertRaises(NoReverseMatch):
+            self.sub_admin.reverse_url('changelist', '', 2)
+        with self.assertRaises(NoReverseMatch):
+            self.sub_admin.get_url_builder('change', 1, 2)('')
+
+    def test_converters_checked_like_reverse(self):
+        sub_admin = self.get_subadmin(Subscriber, Note, site=flat_site)
+        self.assertEqual(sub_admin.reverse_url('changelist', 1, 2), '/flat/tests/mailinglist/1/subscriber/2/note/')
+        with self.assertRaises(NoReverseMatch):
+            sub_admin.reverse_url('changelist', 'abc', 2)
+        with self.assertRaises(NoReverseMatch):
+            sub_admin.get_url_builder('change', 'abc', 2)(3)
+        # The object id is matched by a str converter, which doesn't accept slashes.
+        with self.assertRaises(NoReverseMatch):
+            sub_admin.get_url_builder('change', 1, 2)('a/b')
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from django.urls import path
+
+from .admin import async_site, flat_site, lazy_site, other_site, search_site
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('flat/', flat_site.urls),
+    path('lazy/', lazy_site.urls),
+    path('other/', other_site.urls),
+    path('async/', async_site.urls),
+    path('search/', search_site.urls),
+]